@@ -3,161 +3,208 @@ API 使用例
 Lambda 関数でのモダンな API の実装例
 """
 
-import json
-import sys
-import os
+import secrets
+from types import MappingProxyType
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # ローカル実行時のみリポジトリ直下を import パスに追加（Lambda ではパッケージ直下に配置済み）
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from lambapi import API, Response, create_lambda_handler
+from lambapi.json_handler import JSONHandler
+
+
+# CORS ヘッダー（モジュール読み込み時に一度だけ構築し、各レスポンスで共有する）
+_CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization",
+}
 
 
 # グローバルスコープでのルート定義（重要：パフォーマンス最適化のため）
-def create_app(event, context):
-    """アプリケーション作成関数"""
-    app = API(event, context)
-
-    # CORS 設定のミドルウェア例
-    def cors_middleware(request, response):
-        if isinstance(response, Response):
-            response.headers.update(
-                {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-                    "Access-Control-Allow-Headers": "Content-Type, Authorization",
-                }
-            )
-        return response
-
-    app.add_middleware(cors_middleware)
-
-    # ===== ルート定義 =====
-
-    @app.get("/")
-    def hello_world(request):
-        """基本的な Hello World"""
-        msg = "Hello Lambda!!"
-        print(msg)
-        return {"message": msg}
-
-    @app.get("/health")
-    def health_check(request):
-        """ヘルスチェック"""
-        return {"status": "ok", "service": "lambapi"}
-
-    @app.get("/users/{user_id}")
-    def get_user(user_id: str, include_details: bool = False):
-        """ユーザー取得（パスパラメータ付き）"""
-        user_data = {
-            "user_id": user_id,
-            "name": f"User {user_id}",
-            "email": f"user{user_id}@example.com",
-        }
+# ルート・ミドルウェアはモジュール読み込み時（Lambda の init フェーズ）に一度だけ登録する
+app = API()
+
+
+# CORS 設定のミドルウェア例
+def cors_middleware(request, response):
+    if isinstance(response, Response):
+        response.headers.update(_CORS_HEADERS)
+    return response
+
+
+app.add_middleware(cors_middleware)
+
+# ===== ルート定義 =====
+
+
+@app.get("/")
+def hello_world(request):
+    """基本的な Hello World"""
+    msg = "Hello Lambda!!"
+    print(msg)
+    return {"message": msg}
+
+
+# 固定レスポンスはインポート時に一度だけシリアライズしておく
+_HEALTH_BODY = JSONHandler.dumps({"status": "ok", "service": "lambapi"})
+
+
+@app.get("/health")
+def health_check(request):
+    """ヘルスチェック"""
+    return Response(_HEALTH_BODY, pre_encoded=True)
+
+
+# ユーザー詳細のテンプレート（モジュール読み込み時に一度だけ構築）
+_USER_DETAILS = {
+    "created_at": "2024-01-01T00:00:00Z",
+    "last_login": "2024-01-02T10:30:00Z",
+}
+
+
+@app.get("/users/{user_id}")
+def get_user(user_id: str, include_details: bool = False):
+    """ユーザー取得（パスパラメータ付き）"""
+    user_data = {
+        "user_id": user_id,
+        "name": f"User {user_id}",
+        "email": f"user{user_id}@example.com",
+    }
 
-        if include_details:
-            user_data["details"] = {
-                "created_at": "2024-01-01T00:00:00Z",
-                "last_login": "2024-01-02T10:30:00Z",
-            }
-
-        return user_data
-
-    @app.post("/users")
-    def create_user(request):
-        """ユーザー作成（JSON ボディ）"""
-        try:
-            user_data = request.json()
-
-            # バリデーション例
-            if not user_data.get("name"):
-                return Response({"error": "Name is required"}, status_code=400)
-
-            # 作成処理のシミュレーション
-            new_user = {
-                "id": "generated-id-123",
-                "name": user_data["name"],
-                "email": user_data.get("email", ""),
-                "created_at": "2024-01-01T00:00:00Z",
-            }
-
-            return Response(
-                {"message": "User created successfully", "user": new_user}, status_code=201
-            )
-
-        except Exception as e:
-            return Response({"error": "Invalid JSON data", "detail": str(e)}, status_code=400)
-
-    @app.put("/users/{user_id}")
-    def update_user(user_id: str, request):
-        """ユーザー更新"""
+    if include_details:
+        # 固定の詳細情報はテンプレートを複製する（リテラルから毎回組み立てない）
+        user_data["details"] = _USER_DETAILS.copy()
+
+    return user_data
+
+
+@app.post("/users")
+def create_user(request):
+    """ユーザー作成（JSON ボディ）"""
+    try:
+        # request.json() は orjson がインストールされていれば orjson でパースされる
         user_data = request.json()
 
-        return {"message": f"User {user_id} updated", "data": user_data}
+        # バリデーション例
+        if not user_data.get("name"):
+            return Response({"error": "Name is required"}, status_code=400)
 
-    @app.delete("/users/{user_id}")
-    def delete_user(user_id: str):
-        """ユーザー削除"""
-        return Response({"message": f"User {user_id} deleted"}, status_code=204)
+        # 作成処理のシミュレーション
+        new_user = {
+            "id": "generated-id-123",
+            "name": user_data["name"],
+            "email": user_data.get("email", ""),
+            "created_at": "2024-01-01T00:00:00Z",
+        }
 
-    @app.get("/api/v1/products/{category}")
-    def get_products_by_category(category: str, limit: int = 10, offset: int = 0):
-        """カテゴリ別商品取得（ネストしたパス）"""
+        return Response({"message": "User created successfully", "user": new_user}, status_code=201)
 
-        # 商品データのシミュレーション
-        products = [
-            {
-                "id": f"prod-{category}-{i}",
-                "name": f"{category.title()} Product {i}",
-                "price": 100 + i * 10,
-                "category": category,
-            }
-            for i in range(offset + 1, offset + limit + 1)
-        ]
+    except Exception as e:
+        return Response({"error": "Invalid JSON data", "detail": str(e)}, status_code=400)
 
-        return {
+
+@app.put("/users/{user_id}")
+def update_user(user_id: str, request):
+    """ユーザー更新"""
+    user_data = request.json()
+
+    return {"message": f"User {user_id} updated", "data": user_data}
+
+
+@app.delete("/users/{user_id}")
+def delete_user(user_id: str):
+    """ユーザー削除"""
+    return Response({"message": f"User {user_id} deleted"}, status_code=204)
+
+
+# 商品の総件数（実際のアプリでは DB から取得）
+_PRODUCT_TOTAL = 100
+
+
+@app.get("/api/v1/products/{category}")
+def get_products_by_category(category: str, limit: int = 10, offset: int = 0):
+    """カテゴリ別商品取得（ネストしたパス）"""
+
+    # 商品データのシミュレーション
+    # 生成件数は総件数で打ち切り、行ごとに変わらない値はループの外で一度だけ計算する
+    end = min(offset + limit, _PRODUCT_TOTAL)
+    id_prefix = f"prod-{category}-"
+    name_prefix = f"{category.title()} Product "
+    ids = range(offset + 1, end + 1)
+    # 価格は ID に比例する等差数列なので range で一括生成する
+    prices = range(100 + ids.start * 10, 100 + ids.stop * 10, 10)
+    products = [
+        {
+            "id": id_prefix + suffix,
+            "name": name_prefix + suffix,
+            "price": price,
             "category": category,
-            "products": products,
-            "pagination": {
-                "limit": limit,
-                "offset": offset,
-                "total": 100,  # 実際のアプリでは DB から取得
-            },
         }
+        for suffix, price in zip(map(str, ids), prices)
+    ]
+
+    return {
+        "category": category,
+        "products": products,
+        "pagination": {
+            "limit": limit,
+            "offset": offset,
+            "total": _PRODUCT_TOTAL,
+        },
+    }
 
-    @app.post("/api/v1/auth/login")
-    def login(request):
-        """ログイン例"""
-        credentials = request.json()
 
-        # 簡単な認証チェック
-        if credentials.get("username") == "admin" and credentials.get("password") == "password":
+# デモ用の認証情報（モジュール読み込み時に一度だけ構築）
+_DEMO_USERS = MappingProxyType(
+    {
+        "admin": {
+            "password": b"password",
+            "profile": {"id": "admin-user", "username": "admin", "role": "administrator"},
+        },
+    }
+)
+
+
+@app.post("/api/v1/auth/login")
+def login(request):
+    """ログイン例"""
+    credentials = request.json()
 
-            return {
-                "token": "dummy-jwt-token",
-                "expires_in": 3600,
-                "user": {"id": "admin-user", "username": "admin", "role": "administrator"},
-            }
-        else:
-            return Response({"error": "Invalid credentials"}, status_code=401)
+    # 簡単な認証チェック
+    user = _DEMO_USERS.get(credentials.get("username", ""))
+    password = str(credentials.get("password", "")).encode()
+    # 定数時間比較でタイミング攻撃を防ぐ
+    if user and secrets.compare_digest(user["password"], password):
+        return {
+            "token": "dummy-jwt-token",
+            "expires_in": 3600,
+            "user": user["profile"],
+        }
+    else:
+        return Response({"error": "Invalid credentials"}, status_code=401)
 
-    # エラーハンドリングの例
-    @app.get("/error-test")
-    def error_test(request):
-        """エラーテスト用エンドポイント"""
-        error_type = request.query_params.get("type", "general")
 
-        if error_type == "not_found":
-            return Response({"error": "Resource not found"}, status_code=404)
-        elif error_type == "server_error":
-            raise Exception("Intentional server error for testing")
-        else:
-            return {"message": "No error"}
+# エラーハンドリングの例
+@app.get("/error-test")
+def error_test(request):
+    """エラーテスト用エンドポイント"""
+    error_type = request.query_params.get("type", "general")
 
-    return app
+    if error_type == "not_found":
+        return Response({"error": "Resource not found"}, status_code=404)
+    elif error_type == "server_error":
+        raise Exception("Intentional server error for testing")
+    else:
+        return {"message": "No error"}
 
 
-# Lambda 関数のエントリーポイント
-lambda_handler = create_lambda_handler(create_app)
+# Lambda 関数のエントリーポイント（構築済みの app を渡し、呼び出しごとに event / context を束縛）
+lambda_handler = create_lambda_handler(app)
 
 
 # ローカルテスト用コード
@@ -172,8 +219,8 @@ if __name__ == "__main__":
     }
 
     print("=== Test 1: Basic GET ===")
-    result1 = lambda_handler(test_event_1, None)
-    print(json.dumps(result1, indent=2, ensure_ascii=False))
+    result1 = app.dispatch(test_event_1)
+    print(JSONHandler.dumps(result1, indent=2))
 
     # テストケース 2: パスパラメータ付き GET
     test_event_2 = {
@@ -185,8 +232,8 @@ if __name__ == "__main__":
     }
 
     print("\n=== Test 2: GET with path params ===")
-    result2 = lambda_handler(test_event_2, None)
-    print(json.dumps(result2, indent=2, ensure_ascii=False))
+    result2 = app.dispatch(test_event_2)
+    print(JSONHandler.dumps(result2, indent=2))
 
     # テストケース 3: POST（JSON）
     test_event_3 = {
@@ -194,12 +241,12 @@ if __name__ == "__main__":
         "path": "/users",
         "queryStringParameters": None,
         "headers": {"Content-Type": "application/json"},
-        "body": json.dumps({"name": "John Doe", "email": "john@example.com"}),
+        "body": JSONHandler.dumps({"name": "John Doe", "email": "john@example.com"}),
     }
 
     print("\n=== Test 3: POST with JSON ===")
-    result3 = lambda_handler(test_event_3, None)
-    print(json.dumps(result3, indent=2, ensure_ascii=False))
+    result3 = app.dispatch(test_event_3)
+    print(JSONHandler.dumps(result3, indent=2))
 
     # テストケース 4: 404 エラー
     test_event_4 = {
@@ -211,5 +258,5 @@ if __name__ == "__main__":
     }
 
     print("\n=== Test 4: 404 Error ===")
-    result4 = lambda_handler(test_event_4, None)
-    print(json.dumps(result4, indent=2, ensure_ascii=False))
+    result4 = app.dispatch(test_event_4)
+    print(JSONHandler.dumps(result4, indent=2))
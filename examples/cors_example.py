@@ -5,121 +5,138 @@ CORS 機能の使用例
 様々な CORS 設定パターンを紹介します。
 """
 
-import json
-import sys
-import os
+if __name__ == "__main__":
+    # ローカル実行時のみリポジトリ直下を import パスに追加（Lambda ではパッケージ直下に配置済み）
+    import os
+    import sys
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from lambapi import API, Response, create_lambda_handler, CORSConfig, create_cors_config
+from lambapi.json_handler import JSONHandler
 
 
-def create_app(event, context):
-    """CORS 機能を使ったアプリケーション作成関数"""
-    app = API(event, context)
+# 固定レスポンスはインポート時に一度だけシリアライズしておく
+_HELLO_BODY = JSONHandler.dumps({"message": "Hello CORS World!", "cors": "global"})
+_DEV_TEST_BODY = JSONHandler.dumps({"message": "Development endpoint", "cors": "dev-open"})
+_INTERNAL_BODY = JSONHandler.dumps({"message": "Internal API", "cors": "none"})
 
-    # ===== パターン 1: グローバル CORS 設定 =====
-    # すべてのルートに適用される CORS 設定
-    app.enable_cors(
-        origins=["https://example.com", "https://app.example.com"],
-        methods=["GET", "POST", "PUT", "DELETE"],
-        headers=["Content-Type", "Authorization", "X-API-Key"],
-        allow_credentials=True,
-        max_age=3600,  # プリフライトリクエストのキャッシュ時間（秒）
-    )
+# ルートと CORS 設定はモジュール読み込み時（Lambda の init フェーズ）に一度だけ構築する
+app = API()
 
-    @app.get("/")
-    def hello_world():
-        """基本的なエンドポイント（グローバル CORS 設定が適用される）"""
-        return {"message": "Hello CORS World!", "cors": "global"}
-
-    @app.get("/users")
-    def get_users():
-        """ユーザー一覧取得（グローバル CORS 設定が適用される）"""
-        return {"users": [{"id": 1, "name": "Alice"}, {"id": 2, "name": "Bob"}]}
-
-    @app.post("/users")
-    def create_user(request):
-        """ユーザー作成（グローバル CORS 設定が適用される）"""
-        user_data = request.json()
-        return Response(
-            {"message": "User created successfully", "user": {"id": 3, **user_data}},
-            status_code=201,
-        )
-
-    # ===== パターン 2: ルートレベル CORS 設定（デフォルト） =====
-    @app.get("/public", cors=True)
-    def public_endpoint():
-        """公開エンドポイント（デフォルトの CORS 設定を使用）"""
-        return {"message": "Public endpoint", "cors": "route-default"}
-
-    # ===== パターン 3: ルートレベル カスタム CORS 設定 =====
-    # 特定のエンドポイントのみ異なる CORS 設定を適用
-    strict_cors = create_cors_config(
-        origins=["https://trusted.example.com"],  # 信頼できるオリジンのみ
-        methods=["GET"],  # GET のみ許可
-        headers=["Content-Type"],  # 最小限のヘッダーのみ
-        allow_credentials=False,  # 認証情報は送信不可
-        max_age=7200,  # 長めのキャッシュ時間
-    )
+# ===== パターン 1: グローバル CORS 設定 =====
+# すべてのルートに適用される CORS 設定
+app.enable_cors(
+    origins=["https://example.com", "https://app.example.com"],
+    methods=["GET", "POST", "PUT", "DELETE"],
+    headers=["Content-Type", "Authorization", "X-API-Key"],
+    allow_credentials=True,
+    max_age=3600,  # プリフライトリクエストのキャッシュ時間（秒）
+)
 
-    @app.get("/admin/stats", cors=strict_cors)
-    def admin_stats():
-        """管理者向け統計情報（厳格な CORS 設定）"""
-        return {
-            "message": "Admin statistics",
-            "cors": "route-strict",
-            "stats": {"users": 1000, "requests": 50000},
-        }
-
-    # ===== パターン 4: 開発用 CORS 設定 =====
-    dev_cors = create_cors_config(
-        origins="*",  # 開発時はすべてのオリジンを許可
-        methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-        headers=["*"],  # すべてのヘッダーを許可
-        allow_credentials=False,
-    )
 
-    @app.get("/dev/test", cors=dev_cors)
-    def dev_test():
-        """開発・テスト用エンドポイント"""
-        return {"message": "Development endpoint", "cors": "dev-open"}
-
-    # ===== パターン 5: CORS 無効のエンドポイント =====
-    @app.get("/internal")
-    def internal_api():
-        """内部 API（CORS ヘッダーなし）"""
-        return {"message": "Internal API", "cors": "none"}
-
-    # ===== パターン 6: 個別メソッドでの異なる CORS 設定 =====
-    api_cors = create_cors_config(
-        origins=["https://api-client.example.com"],
-        methods=["GET", "POST"],
-        headers=["Content-Type", "Authorization"],
+@app.get("/")
+def hello_world():
+    """基本的なエンドポイント（グローバル CORS 設定が適用される）"""
+    return Response(_HELLO_BODY, pre_encoded=True)
+
+
+@app.get("/users")
+def get_users():
+    """ユーザー一覧取得（グローバル CORS 設定が適用される）"""
+    return {"users": [{"id": 1, "name": "Alice"}, {"id": 2, "name": "Bob"}]}
+
+
+@app.post("/users")
+def create_user(request):
+    """ユーザー作成（グローバル CORS 設定が適用される）"""
+    user_data = request.json()
+    return Response(
+        {"message": "User created successfully", "user": {"id": 3, **user_data}},
+        status_code=201,
     )
 
-    @app.get("/api/data", cors=api_cors)
-    def get_api_data():
-        """API データ取得"""
-        return {"data": "API response", "cors": "api-specific"}
 
-    @app.post("/api/data", cors=api_cors)
-    def post_api_data(request):
-        """API データ投稿"""
-        data = request.json()
-        return {"message": "Data received", "received": data}
+# ===== パターン 2: ルートレベル CORS 設定（デフォルト） =====
+@app.get("/public", cors=True)
+def public_endpoint():
+    """公開エンドポイント（デフォルトの CORS 設定を使用）"""
+    return {"message": "Public endpoint", "cors": "route-default"}
+
+
+# ===== パターン 3: ルートレベル カスタム CORS 設定 =====
+# 特定のエンドポイントのみ異なる CORS 設定を適用
+_STRICT_CORS = create_cors_config(
+    origins=["https://trusted.example.com"],  # 信頼できるオリジンのみ
+    methods=["GET"],  # GET のみ許可
+    headers=["Content-Type"],  # 最小限のヘッダーのみ
+    allow_credentials=False,  # 認証情報は送信不可
+    max_age=7200,  # 長めのキャッシュ時間
+)
+
+
+@app.get("/admin/stats", cors=_STRICT_CORS)
+def admin_stats():
+    """管理者向け統計情報（厳格な CORS 設定）"""
+    return {
+        "message": "Admin statistics",
+        "cors": "route-strict",
+        "stats": {"users": 1000, "requests": 50000},
+    }
+
+
+# ===== パターン 4: 開発用 CORS 設定 =====
+_DEV_CORS = create_cors_config(
+    origins="*",  # 開発時はすべてのオリジンを許可
+    methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
+    headers=["*"],  # すべてのヘッダーを許可
+    allow_credentials=False,
+)
+
+
+@app.get("/dev/test", cors=_DEV_CORS)
+def dev_test():
+    """開発・テスト用エンドポイント"""
+    return Response(_DEV_TEST_BODY, pre_encoded=True)
+
+
+# ===== パターン 5: CORS 無効のエンドポイント =====
+@app.get("/internal")
+def internal_api():
+    """内部 API（CORS ヘッダーなし）"""
+    return Response(_INTERNAL_BODY, pre_encoded=True)
+
+
+# ===== パターン 6: 個別メソッドでの異なる CORS 設定 =====
+_API_CORS = create_cors_config(
+    origins=["https://api-client.example.com"],
+    methods=["GET", "POST"],
+    headers=["Content-Type", "Authorization"],
+)
+
+
+@app.get("/api/data", cors=_API_CORS)
+def get_api_data():
+    """API データ取得"""
+    return {"data": "API response", "cors": "api-specific"}
+
+
+@app.post("/api/data", cors=_API_CORS)
+def post_api_data(request):
+    """API データ投稿"""
+    data = request.json()
+    return {"message": "Data received", "received": data}
 
-    # ===== エラーハンドリングのテスト =====
-    @app.get("/error-test")
-    def error_test():
-        """エラーテスト（エラーレスポンスにも CORS ヘッダーが付与される）"""
-        raise Exception("Test error for CORS")
 
-    return app
+# ===== エラーハンドリングのテスト =====
+@app.get("/error-test")
+def error_test():
+    """エラーテスト（エラーレスポンスにも CORS ヘッダーが付与される）"""
+    raise Exception("Test error for CORS")
 
 
 # Lambda 関数のエントリーポイント
-lambda_handler = create_lambda_handler(create_app)
+lambda_handler = create_lambda_handler(app)
 
 
 # ローカルテスト用コード
@@ -136,7 +153,7 @@ if __name__ == "__main__":
     }
 
     print("1. 通常の GET リクエスト（グローバル CORS）:")
-    result1 = lambda_handler(test_event_1, None)
+    result1 = app.dispatch(test_event_1)
     print(f"Status: {result1['statusCode']}")
     print(f"CORS Origin: {result1['headers'].get('Access-Control-Allow-Origin')}")
     print(f"CORS Methods: {result1['headers'].get('Access-Control-Allow-Methods')}")
@@ -156,7 +173,7 @@ if __name__ == "__main__":
     }
 
     print("2. OPTIONS プリフライトリクエスト:")
-    result2 = lambda_handler(test_event_2, None)
+    result2 = app.dispatch(test_event_2)
     print(f"Status: {result2['statusCode']}")
     print(f"CORS Origin: {result2['headers'].get('Access-Control-Allow-Origin')}")
     print(f"CORS Methods: {result2['headers'].get('Access-Control-Allow-Methods')}")
@@ -174,7 +191,7 @@ if __name__ == "__main__":
     }
 
     print("3. ルートレベル厳格 CORS 設定:")
-    result3 = lambda_handler(test_event_3, None)
+    result3 = app.dispatch(test_event_3)
     print(f"Status: {result3['statusCode']}")
     print(f"CORS Origin: {result3['headers'].get('Access-Control-Allow-Origin')}")
     print(f"CORS Methods: {result3['headers'].get('Access-Control-Allow-Methods')}")
@@ -190,7 +207,7 @@ if __name__ == "__main__":
     }
 
     print("4. 許可されていないオリジンからのリクエスト:")
-    result4 = lambda_handler(test_event_4, None)
+    result4 = app.dispatch(test_event_4)
     print(f"Status: {result4['statusCode']}")
     print(f"CORS Origin: {result4['headers'].get('Access-Control-Allow-Origin')}")
     print(f"Response: {result4['body']}\n")
@@ -205,7 +222,7 @@ if __name__ == "__main__":
     }
 
     print("5. 404 エラーでの CORS ヘッダー:")
-    result5 = lambda_handler(test_event_5, None)
+    result5 = app.dispatch(test_event_5)
     print(f"Status: {result5['statusCode']}")
     print(f"CORS Origin: {result5['headers'].get('Access-Control-Allow-Origin')}")
     print(f"Response: {result5['body']}\n")
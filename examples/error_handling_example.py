@@ -4,11 +4,16 @@
 この例では、統一されたエラーレスポンス形式とカスタム例外の使用方法を紹介します。
 """
 
-import json
-import sys
-import os
+import re
+from collections import Counter
+from types import SimpleNamespace
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # ローカル実行時のみリポジトリ直下を import パスに追加（Lambda ではパッケージ直下に配置済み）
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from lambapi import (
     API,
@@ -26,340 +31,344 @@ from lambapi import (
     error_handler,
     default_error_handler,
 )
+from lambapi.json_handler import JSONHandler
+
+
+# ルート・ミドルウェアはモジュール読み込み時（Lambda の init フェーズ）に一度だけ登録する
+app = API()
+
+# CORS 設定
+app.enable_cors()
+
+
+# 入力チェック用のパターンはインポート時に一度だけコンパイルしておく
+_EMAIL_MATCH = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+").match
 
 
-def create_app(event, context):
-    """エラーハンドリング機能を使ったアプリケーション作成関数"""
-    app = API(event, context)
-
-    # CORS 設定
-    app.enable_cors()
-
-    # ===== 基本的なエラー例 =====
-
-    @app.get("/users/{user_id}")
-    def get_user(user_id: str):
-        """ユーザー取得エンドポイント"""
-        # バリデーション
-        if not user_id.isdigit():
-            raise ValidationError("User ID must be numeric", field="user_id", value=user_id)
-
-        user_id_int = int(user_id)
-        if user_id_int <= 0:
-            raise ValidationError("User ID must be positive", field="user_id", value=user_id_int)
-
-        # 存在チェック
-        if user_id_int > 1000:
-            raise NotFoundError("User", user_id_int)
-
-        return {
-            "id": user_id_int,
-            "name": f"User {user_id_int}",
-            "email": f"user{user_id_int}@example.com",
-        }
-
-    @app.post("/users")
-    def create_user(request):
-        """ユーザー作成エンドポイント"""
-        try:
-            user_data = request.json()
-        except Exception:
-            raise ValidationError("Invalid JSON format")
-
-        # 必須フィールドチェック
-        if not user_data.get("name"):
-            raise ValidationError("Name is required", field="name")
-
-        if not user_data.get("email"):
-            raise ValidationError("Email is required", field="email")
-
-        # メール形式チェック
-        email = user_data["email"]
-        if "@" not in email:
-            raise ValidationError("Invalid email format", field="email", value=email)
-
-        # 重複チェック（例）
-        if email == "admin@example.com":
-            raise ConflictError("Email already exists", resource="user", details={"email": email})
-
-        return Response(
-            {
-                "message": "User created successfully",
-                "user": {"id": 123, "name": user_data["name"], "email": email},
-            },
-            status_code=201,
+# ===== 基本的なエラー例 =====
+@app.get("/users/{user_id}")
+def get_user(user_id: str):
+    """ユーザー取得エンドポイント"""
+    # バリデーション
+    if not user_id.isdigit():
+        raise ValidationError("User ID must be numeric", field="user_id", value=user_id)
+
+    user_id_int = int(user_id)
+    if user_id_int <= 0:
+        raise ValidationError("User ID must be positive", field="user_id", value=user_id_int)
+
+    # 存在チェック
+    if user_id_int > 1000:
+        raise NotFoundError("User", user_id_int)
+
+    return {
+        "id": user_id_int,
+        "name": f"User {user_id_int}",
+        "email": f"user{user_id_int}@example.com",
+    }
+
+
+@app.post("/users")
+def create_user(request):
+    """ユーザー作成エンドポイント"""
+    try:
+        user_data = request.json()
+    except Exception:
+        raise ValidationError("Invalid JSON format")
+
+    # 必須フィールドチェック
+    if not user_data.get("name"):
+        raise ValidationError("Name is required", field="name")
+
+    if not user_data.get("email"):
+        raise ValidationError("Email is required", field="email")
+
+    # メール形式チェック
+    email = user_data["email"]
+    if not _EMAIL_MATCH(email):
+        raise ValidationError("Invalid email format", field="email", value=email)
+
+    # 重複チェック（例）
+    if email == "admin@example.com":
+        raise ConflictError("Email already exists", resource="user", details={"email": email})
+
+    return Response(
+        {
+            "message": "User created successfully",
+            "user": {"id": 123, "name": user_data["name"], "email": email},
+        },
+        status_code=201,
+    )
+
+
+# ===== 認証・認可エラー例 =====
+@app.get("/admin/dashboard")
+def admin_dashboard(request):
+    """管理者ダッシュボード"""
+    # 認証チェック
+    auth_header = request.headers.get("Authorization")
+    if not auth_header:
+        raise AuthenticationError("Authorization header required")
+
+    # "Bearer " を除去（接頭辞がなければ元の文字列がそのまま返る）
+    token = auth_header.removeprefix("Bearer ")
+    if token == auth_header:
+        raise AuthenticationError("Bearer token required")
+
+    # トークン検証（例）
+    if token != "valid-admin-token":  # nosec B105
+        raise AuthenticationError("Invalid token")
+
+    # 権限チェック（例）
+    if token == "user-token":  # nosec B105
+        raise AuthorizationError("Admin privileges required", resource="dashboard", action="read")
+
+    return {
+        "message": "Admin dashboard",
+        "stats": {"users": 1000, "orders": 5000, "revenue": 100000},
+    }
+
+
+# ===== レート制限エラー例 =====
+
+# 簡易レート制限カウンター（実際には Redis などを使用）
+_rate_limit_counter = Counter()
+_RATE_LIMIT = 5
+
+
+@app.get("/api/data")
+def get_api_data(request):
+    """レート制限付き API エンドポイント"""
+    # クライアント識別（実際には IP アドレスや API キーを使用）
+    client_id = request.headers.get("X-Client-ID", "anonymous")
+
+    # レート制限チェック（未登録のクライアントは Counter が 0 を返す）
+    count = _rate_limit_counter[client_id] + 1
+    if count > _RATE_LIMIT:  # 5 回まで
+        raise RateLimitError(
+            "API rate limit exceeded", retry_after=60, details={"limit": _RATE_LIMIT, "window": 60}
         )
 
-    # ===== 認証・認可エラー例 =====
-
-    @app.get("/admin/dashboard")
-    def admin_dashboard(request):
-        """管理者ダッシュボード"""
-        # 認証チェック
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            raise AuthenticationError("Authorization header required")
-
-        if not auth_header.startswith("Bearer "):
-            raise AuthenticationError("Bearer token required")
+    _rate_limit_counter[client_id] = count
+
+    return {
+        "data": "API response data",
+        "remaining_requests": _RATE_LIMIT - count,
+    }
+
+
+# ===== タイムアウトエラー例 =====
+@app.get("/slow-operation")
+def slow_operation(request, context):
+    """時間のかかる処理のシミュレーション"""
+    # 残り時間チェック
+    remaining_time = context.get_remaining_time_in_millis()
+    if remaining_time < 5000:  # 5 秒未満の場合
+        raise TimeoutError(
+            "Insufficient time to complete operation",
+            timeout_seconds=5.0,
+            details={"remaining_time_ms": remaining_time},
+        )
+
+    # 実際の処理（シミュレーション）
+    # time.sleep(2)  # 実際にはデータベースアクセスなど
+
+    return {"message": "Operation completed", "duration": "2 seconds"}
 
-        token = auth_header[7:]  # "Bearer " を除去
-
-        # トークン検証（例）
-        if token != "valid-admin-token":  # nosec B105
-            raise AuthenticationError("Invalid token")
-
-        # 権限チェック（例）
-        if token == "user-token":  # nosec B105
-            raise AuthorizationError(
-                "Admin privileges required", resource="dashboard", action="read"
-            )
-
-        return {
-            "message": "Admin dashboard",
-            "stats": {"users": 1000, "orders": 5000, "revenue": 100000},
-        }
-
-    # ===== レート制限エラー例 =====
-
-    # 簡易レート制限カウンター（実際には Redis などを使用）
-    _rate_limit_counter = {}
-
-    @app.get("/api/data")
-    def get_api_data(request):
-        """レート制限付き API エンドポイント"""
-        # クライアント識別（実際には IP アドレスや API キーを使用）
-        client_id = request.headers.get("X-Client-ID", "anonymous")
-
-        # レート制限チェック
-        current_count = _rate_limit_counter.get(client_id, 0)
-        if current_count >= 5:  # 5 回まで
-            raise RateLimitError(
-                "API rate limit exceeded", retry_after=60, details={"limit": 5, "window": 60}
-            )
-
-        _rate_limit_counter[client_id] = current_count + 1
-
-        return {
-            "data": "API response data",
-            "remaining_requests": 5 - _rate_limit_counter[client_id],
-        }
-
-    # ===== タイムアウトエラー例 =====
-
-    @app.get("/slow-operation")
-    def slow_operation(request, context):
-        """時間のかかる処理のシミュレーション"""
-        import time
-
-        # 残り時間チェック
-        remaining_time = context.get_remaining_time_in_millis()
-        if remaining_time < 5000:  # 5 秒未満の場合
-            raise TimeoutError(
-                "Insufficient time to complete operation",
-                timeout_seconds=5.0,
-                details={"remaining_time_ms": remaining_time},
-            )
-
-        # 実際の処理（シミュレーション）
-        # time.sleep(2)  # 実際にはデータベースアクセスなど
-
-        return {"message": "Operation completed", "duration": "2 seconds"}
-
-    # ===== サービス利用不可エラー例 =====
-
-    @app.get("/external-service")
-    def external_service():
-        """外部サービス連携"""
-        # 外部サービスの状態チェック（例）
-        service_available = False  # 実際にはヘルスチェック API を呼び出し
-
-        if not service_available:
-            raise ServiceUnavailableError(
-                "External service temporarily unavailable",
-                retry_after=300,
-                details={"service": "payment-gateway"},
-            )
-
-        return {"message": "External service response"}
-
-    # ===== 内部サーバーエラー例 =====
-
-    @app.get("/database-operation")
-    def database_operation():
-        """データベース操作"""
-        try:
-            # データベース接続（例）
-            database_connected = False  # 実際にはデータベース接続を試行
-            if not database_connected:
-                raise Exception("Database connection failed")
-
-            return {"data": "Database query result"}
-
-        except Exception as e:
-            raise InternalServerError(
-                "Database operation failed", details={"error": str(e), "operation": "SELECT"}
-            )
-
-    # ===== カスタムエラーハンドラー例 =====
-
-    class BusinessLogicError(Exception):
-        """ビジネスロジック関連のカスタムエラー"""
-
-        def __init__(self, message: str, business_code: str):
-            self.message = message
-            self.business_code = business_code
-            super().__init__(message)
-
-    @app.error_handler(BusinessLogicError)
-    def handle_business_error(error, request, context):
-        """ビジネスロジックエラーのカスタムハンドラー"""
-        return Response(
-            {
-                "error": "BUSINESS_LOGIC_ERROR",
-                "message": error.message,
-                "business_code": error.business_code,
-                "request_id": context.aws_request_id,
-                "timestamp": "2024-01-01T12:00:00Z",
-            },
-            status_code=422,
-        )  # Unprocessable Entity
-
-    @app.get("/business-operation")
-    def business_operation():
-        """ビジネスロジック処理"""
-        # ビジネスルールチェック
-        business_condition = False  # 例：在庫切れ、残高不足など
-
-        if not business_condition:
-            raise BusinessLogicError("Insufficient inventory", business_code="INV001")
-
-        return {"message": "Business operation completed"}
-
-    # ===== デフォルトエラーハンドラーのカスタマイズ =====
-
-    @app.default_error_handler
-    def custom_default_handler(error, request, context):
-        """カスタムデフォルトエラーハンドラー"""
-        return Response(
-            {
-                "error": "UNEXPECTED_ERROR",
-                "message": "An unexpected error occurred",
-                "error_type": type(error).__name__,
-                "request_id": context.aws_request_id,
-                "support_message": "Please contact support with this request ID",
-            },
-            status_code=500,
+
+# ===== サービス利用不可エラー例 =====
+@app.get("/external-service")
+def external_service():
+    """外部サービス連携"""
+    # 外部サービスの状態チェック（例）
+    service_available = False  # 実際にはヘルスチェック API を呼び出し
+
+    if not service_available:
+        raise ServiceUnavailableError(
+            "External service temporarily unavailable",
+            retry_after=300,
+            details={"service": "payment-gateway"},
         )
 
-    @app.get("/unexpected-error")
-    def unexpected_error():
-        """予期しないエラーの例"""
-        # 予期しないエラー
-        raise ValueError("This is an unexpected error")
+    return {"message": "External service response"}
 
-    # ===== エラーテスト用エンドポイント =====
 
-    @app.get("/error-demo/{error_type}")
-    def error_demo(error_type: str):
-        """エラーデモ用エンドポイント"""
-        error_map = {
-            "validation": lambda: ValidationError("Demo validation error", field="demo"),
-            "not_found": lambda: NotFoundError("DemoResource", "123"),
-            "auth": lambda: AuthenticationError("Demo auth error"),
-            "forbidden": lambda: AuthorizationError("Demo authorization error"),
-            "conflict": lambda: ConflictError("Demo conflict error"),
-            "rate_limit": lambda: RateLimitError("Demo rate limit", retry_after=30),
-            "timeout": lambda: TimeoutError("Demo timeout"),
-            "internal": lambda: InternalServerError("Demo internal error"),
-            "unavailable": lambda: ServiceUnavailableError("Demo service unavailable"),
-        }
+# ===== 内部サーバーエラー例 =====
+@app.get("/database-operation")
+def database_operation():
+    """データベース操作"""
+    try:
+        # データベース接続（例）
+        database_connected = False  # 実際にはデータベース接続を試行
+        if not database_connected:
+            raise Exception("Database connection failed")
 
-        if error_type not in error_map:
-            raise ValidationError("Invalid error type", field="error_type", value=error_type)
+        return {"data": "Database query result"}
+
+    except Exception as e:
+        raise InternalServerError(
+            "Database operation failed", details={"error": str(e), "operation": "SELECT"}
+        )
 
-        raise error_map[error_type]()
 
-    return app
+# ===== カスタムエラーハンドラー例 =====
+class BusinessLogicError(Exception):
+    """ビジネスロジック関連のカスタムエラー"""
+
+    # 属性をスロットに保持し、送出のたびにインスタンス辞書を作らないようにする
+    __slots__ = ("message", "business_code")
+
+    def __init__(self, message: str, business_code: str):
+        self.message = message
+        self.business_code = business_code
+        super().__init__(message)
+
+
+@error_handler(BusinessLogicError)
+def handle_business_error(error, request, context):
+    """ビジネスロジックエラーのカスタムハンドラー"""
+    return Response(
+        {
+            "error": "BUSINESS_LOGIC_ERROR",
+            "message": error.message,
+            "business_code": error.business_code,
+            "request_id": context.aws_request_id,
+            "timestamp": "2024-01-01T12:00:00Z",
+        },
+        status_code=422,
+    )  # Unprocessable Entity
+
+
+@app.get("/business-operation")
+def business_operation():
+    """ビジネスロジック処理"""
+    # ビジネスルールチェック
+    business_condition = False  # 例：在庫切れ、残高不足など
+
+    if not business_condition:
+        raise BusinessLogicError("Insufficient inventory", business_code="INV001")
+
+    return {"message": "Business operation completed"}
+
+
+# ===== デフォルトエラーハンドラーのカスタマイズ =====
+@default_error_handler
+def custom_default_handler(error, request, context):
+    """カスタムデフォルトエラーハンドラー"""
+    return Response(
+        {
+            "error": "UNEXPECTED_ERROR",
+            "message": "An unexpected error occurred",
+            "error_type": type(error).__name__,
+            "request_id": context.aws_request_id,
+            "support_message": "Please contact support with this request ID",
+        },
+        status_code=500,
+    )
+
+
+@app.get("/unexpected-error")
+def unexpected_error():
+    """予期しないエラーの例"""
+    # 予期しないエラー
+    raise ValueError("This is an unexpected error")
+
+
+# ===== エラーテスト用エンドポイント =====
+# エラー種別と (例外クラス, 位置引数, キーワード引数) の対応表（モジュール読み込み時に一度だけ構築）
+_ERROR_FACTORIES = {
+    "validation": (ValidationError, ("Demo validation error",), {"field": "demo"}),
+    "not_found": (NotFoundError, ("DemoResource", "123"), {}),
+    "auth": (AuthenticationError, ("Demo auth error",), {}),
+    "forbidden": (AuthorizationError, ("Demo authorization error",), {}),
+    "conflict": (ConflictError, ("Demo conflict error",), {}),
+    "rate_limit": (RateLimitError, ("Demo rate limit",), {"retry_after": 30}),
+    "timeout": (TimeoutError, ("Demo timeout",), {}),
+    "internal": (InternalServerError, ("Demo internal error",), {}),
+    "unavailable": (ServiceUnavailableError, ("Demo service unavailable",), {}),
+}
+
+
+@app.get("/error-demo/{error_type}")
+def error_demo(error_type: str):
+    """エラーデモ用エンドポイント"""
+    spec = _ERROR_FACTORIES.get(error_type)
+    if spec is None:
+        raise ValidationError("Invalid error type", field="error_type", value=error_type)
+
+    error_class, args, kwargs = spec
+    raise error_class(*args, **kwargs)
 
 
 # Lambda 関数のエントリーポイント
-lambda_handler = create_lambda_handler(create_app)
+lambda_handler = create_lambda_handler(app)
 
 
 # ローカルテスト用コード
 if __name__ == "__main__":
     print("=== 構造化エラーハンドリングのテスト ===\n")
 
-    # テストケース 1: ValidationError
-    test_event_1 = {
+    # 共通のイベント雛形を用意し、テストごとに異なるフィールドだけを上書きする
+    base_event = {
         "httpMethod": "GET",
-        "path": "/users/abc",
+        "path": "/",
         "queryStringParameters": None,
         "headers": {"Content-Type": "application/json"},
         "body": None,
     }
+    # エラーハンドラーやタイムアウト判定が参照する Lambda コンテキストの代用
+    context = SimpleNamespace(
+        aws_request_id="test-request-id", get_remaining_time_in_millis=lambda: 30000
+    )
+
+    # テストケース 1: ValidationError
+    test_event_1 = {**base_event, "path": "/users/abc"}
 
     print("1. ValidationError テスト:")
-    result1 = lambda_handler(test_event_1, None)
+    result1 = app.dispatch(test_event_1, context)
     print(f"Status: {result1['statusCode']}")
     print(f"Response: {result1['body']}\n")
 
     # テストケース 2: NotFoundError
-    test_event_2 = {
-        "httpMethod": "GET",
-        "path": "/users/9999",
-        "queryStringParameters": None,
-        "headers": {"Content-Type": "application/json"},
-        "body": None,
-    }
+    test_event_2 = {**base_event, "path": "/users/9999"}
 
     print("2. NotFoundError テスト:")
-    result2 = lambda_handler(test_event_2, None)
+    result2 = app.dispatch(test_event_2, context)
     print(f"Status: {result2['statusCode']}")
     print(f"Response: {result2['body']}\n")
 
     # テストケース 3: AuthenticationError
-    test_event_3 = {
-        "httpMethod": "GET",
-        "path": "/admin/dashboard",
-        "queryStringParameters": None,
-        "headers": {"Content-Type": "application/json"},
-        "body": None,
-    }
+    test_event_3 = {**base_event, "path": "/admin/dashboard"}
 
     print("3. AuthenticationError テスト:")
-    result3 = lambda_handler(test_event_3, None)
+    result3 = app.dispatch(test_event_3, context)
     print(f"Status: {result3['statusCode']}")
     print(f"Headers: {result3['headers']}")
     print(f"Response: {result3['body']}\n")
 
     # テストケース 4: ConflictError
     test_event_4 = {
+        **base_event,
         "httpMethod": "POST",
         "path": "/users",
-        "queryStringParameters": None,
-        "headers": {"Content-Type": "application/json"},
-        "body": json.dumps({"name": "Admin User", "email": "admin@example.com"}),
+        "body": JSONHandler.dumps({"name": "Admin User", "email": "admin@example.com"}),
     }
 
     print("4. ConflictError テスト:")
-    result4 = lambda_handler(test_event_4, None)
+    result4 = app.dispatch(test_event_4, context)
     print(f"Status: {result4['statusCode']}")
     print(f"Response: {result4['body']}\n")
 
     # テストケース 5: RateLimitError
     test_event_5 = {
-        "httpMethod": "GET",
+        **base_event,
         "path": "/api/data",
-        "queryStringParameters": None,
         "headers": {"Content-Type": "application/json", "X-Client-ID": "test-client"},
-        "body": None,
     }
 
     print("5. RateLimitError テスト (6 回呼び出し):")
     for i in range(6):
-        result5 = lambda_handler(test_event_5, None)
+        result5 = app.dispatch(test_event_5, context)
         print(f"Call {i + 1}: Status {result5['statusCode']}")
         if result5["statusCode"] == 429:
             print(f"Rate limited: {result5['body']}")
@@ -367,16 +376,10 @@ if __name__ == "__main__":
     print()
 
     # テストケース 6: カスタムエラーハンドラー
-    test_event_6 = {
-        "httpMethod": "GET",
-        "path": "/business-operation",
-        "queryStringParameters": None,
-        "headers": {"Content-Type": "application/json"},
-        "body": None,
-    }
+    test_event_6 = {**base_event, "path": "/business-operation"}
 
     print("6. カスタムエラーハンドラー テスト:")
-    result6 = lambda_handler(test_event_6, None)
+    result6 = app.dispatch(test_event_6, context)
     print(f"Status: {result6['statusCode']}")
     print(f"Response: {result6['body']}\n")
 
@@ -384,14 +387,7 @@ if __name__ == "__main__":
     error_types = ["validation", "not_found", "auth", "rate_limit"]
     print("7. エラーデモ:")
     for error_type in error_types:
-        test_event = {
-            "httpMethod": "GET",
-            "path": f"/error-demo/{error_type}",
-            "queryStringParameters": None,
-            "headers": {"Content-Type": "application/json"},
-            "body": None,
-        }
-        result = lambda_handler(test_event, None)
+        result = app.dispatch({**base_event, "path": f"/error-demo/{error_type}"}, context)
         print(f"  {error_type}: Status {result['statusCode']}")
 
     print("\n=== エラーハンドリングテスト完了 ===")
@@ -2,139 +2,162 @@
 ローカルサーバーテスト用のサンプルアプリケーション
 """
 
+from itertools import count, islice
+from types import SimpleNamespace
+
 from lambapi import API, Response, create_lambda_handler
 from lambapi.exceptions import ValidationError, NotFoundError
+from lambapi.json_handler import JSONHandler
+
+# サンプルデータストア（ウォームコンテナ内では呼び出し間で共有される）
+users_db = {
+    "1": {"id": "1", "name": "Alice", "email": "alice@example.com"},
+    "2": {"id": "2", "name": "Bob", "email": "bob@example.com"},
+    "3": {"id": "3", "name": "Charlie", "email": "charlie@example.com"},
+}
+
+
+def _search_key(user):
+    """検索用の小文字化済みキー（名前とメールを区切り文字で連結）"""
+    return f"{user['name']}\0{user['email']}".lower()
+
 
+# 検索用キーは登録・更新時に一度だけ小文字化し、検索のたびに変換しないようにする
+_search_keys = {user_id: _search_key(user) for user_id, user in users_db.items()}
 
-def create_app(event, context):
-    app = API(event, context)
+# ユーザー ID 採番用カウンター（削除後も ID が重複しないよう単調増加させる）
+_user_id_gen = count(len(users_db) + 1)
 
-    # サンプルデータストア
-    users_db = {
-        "1": {"id": "1", "name": "Alice", "email": "alice@example.com"},
-        "2": {"id": "2", "name": "Bob", "email": "bob@example.com"},
-        "3": {"id": "3", "name": "Charlie", "email": "charlie@example.com"},
+
+# ルート・ミドルウェアはモジュール読み込み時（Lambda の init フェーズ）に一度だけ登録する
+app = API()
+
+
+@app.get("/")
+def root():
+    """API のルートエンドポイント"""
+    return {
+        "message": "lambapi ローカルサーバーへようこそ！",
+        "version": "1.0.0",
+        "endpoints": [
+            "GET /",
+            "GET /hello/{name}",
+            "GET /users",
+            "POST /users",
+            "GET /users/{user_id}",
+            "PUT /users/{user_id}",
+            "DELETE /users/{user_id}",
+        ],
     }
 
-    @app.get("/")
-    def root():
-        """API のルートエンドポイント"""
-        return {
-            "message": "lambapi ローカルサーバーへようこそ！",
-            "version": "1.0.0",
-            "endpoints": [
-                "GET /",
-                "GET /hello/{name}",
-                "GET /users",
-                "POST /users",
-                "GET /users/{user_id}",
-                "PUT /users/{user_id}",
-                "DELETE /users/{user_id}",
-            ],
-        }
-
-    @app.get("/hello/{name}")
-    def hello(name: str, lang: str = "ja"):
-        """多言語対応の挨拶エンドポイント"""
-        greetings = {
-            "ja": f"こんにちは、{name}さん！",
-            "en": f"Hello, {name}!",
-            "es": f"¡Hola, {name}!",
-        }
-        return {"message": greetings.get(lang, greetings["en"]), "name": name, "language": lang}
-
-    @app.get("/users")
-    def get_users(limit: int = 10, search: str = ""):
-        """ユーザー一覧取得"""
-        users = list(users_db.values())
-
-        # 検索フィルター
-        if search:
-            users = [
-                user
-                for user in users
-                if search.lower() in user["name"].lower() or search.lower() in user["email"].lower()
-            ]
-
-        # リミット適用
-        users = users[:limit]
-
-        return {
-            "users": users,
-            "total": len(users),
-            "limit": limit,
-            "search": search if search else None,
-        }
-
-    @app.get("/users/{user_id}")
-    def get_user(user_id: str):
-        """特定ユーザー取得"""
-        if user_id not in users_db:
-            raise NotFoundError("User", user_id)
-
-        return {"user": users_db[user_id]}
-
-    @app.post("/users")
-    def create_user(request):
-        """新しいユーザー作成"""
-        data = request.json()
-
-        # バリデーション
-        if not data.get("name"):
-            raise ValidationError("Name is required", field="name")
-        if not data.get("email"):
-            raise ValidationError("Email is required", field="email")
-
-        # 新しいユーザー ID を生成
-        new_id = str(len(users_db) + 1)
-
-        user = {"id": new_id, "name": data["name"], "email": data["email"]}
-
-        users_db[new_id] = user
-
-        return Response({"message": "User created successfully", "user": user}, status_code=201)
-
-    @app.put("/users/{user_id}")
-    def update_user(user_id: str, request):
-        """ユーザー更新"""
-        if user_id not in users_db:
-            raise NotFoundError("User", user_id)
-
-        data = request.json()
-        user = users_db[user_id]
-
-        # 更新可能なフィールドのみ処理
-        if "name" in data:
-            user["name"] = data["name"]
-        if "email" in data:
-            user["email"] = data["email"]
-
-        return {"message": "User updated successfully", "user": user}
-
-    @app.delete("/users/{user_id}")
-    def delete_user(user_id: str):
-        """ユーザー削除"""
-        if user_id not in users_db:
-            raise NotFoundError("User", user_id)
-
-        deleted_user = users_db.pop(user_id)
-
-        return {
-            "message": f"User {deleted_user['name']} deleted successfully",
-            "deleted_user_id": user_id,
-        }
-
-    return app
+
+# 挨拶文のテンプレート（リクエストごとに選ばれた 1 言語分だけを整形する）
+_GREETING_TEMPLATES = {
+    "ja": "こんにちは、{}さん！",
+    "en": "Hello, {}!",
+    "es": "¡Hola, {}!",
+}
+
+
+@app.get("/hello/{name}")
+def hello(name: str, lang: str = "ja"):
+    """多言語対応の挨拶エンドポイント"""
+    template = _GREETING_TEMPLATES.get(lang, _GREETING_TEMPLATES["en"])
+    return {"message": template.format(name), "name": name, "language": lang}
+
+
+@app.get("/users")
+def get_users(limit: int = 10, search: str = ""):
+    """ユーザー一覧取得"""
+    users = users_db.values()
+
+    # 検索フィルター（遅延評価し、limit 件見つかった時点で走査を打ち切る）
+    if search:
+        search_lc = search.lower()
+        users = (users_db[user_id] for user_id, key in _search_keys.items() if search_lc in key)
+
+    # リミット適用
+    users = list(islice(users, max(limit, 0)))
+
+    return {
+        "users": users,
+        "total": len(users),
+        "limit": limit,
+        "search": search if search else None,
+    }
+
+
+@app.get("/users/{user_id}")
+def get_user(user_id: str):
+    """特定ユーザー取得"""
+    if user_id not in users_db:
+        raise NotFoundError("User", user_id)
+
+    return {"user": users_db[user_id]}
+
+
+@app.post("/users")
+def create_user(request):
+    """新しいユーザー作成"""
+    data = request.json()
+
+    # バリデーション
+    if not data.get("name"):
+        raise ValidationError("Name is required", field="name")
+    if not data.get("email"):
+        raise ValidationError("Email is required", field="email")
+
+    # 新しいユーザー ID を生成
+    new_id = str(next(_user_id_gen))
+
+    user = {"id": new_id, "name": data["name"], "email": data["email"]}
+
+    users_db[new_id] = user
+    _search_keys[new_id] = _search_key(user)
+
+    return Response({"message": "User created successfully", "user": user}, status_code=201)
+
+
+@app.put("/users/{user_id}")
+def update_user(user_id: str, request):
+    """ユーザー更新"""
+    if user_id not in users_db:
+        raise NotFoundError("User", user_id)
+
+    data = request.json()
+    user = users_db[user_id]
+
+    # 更新可能なフィールドのみ処理
+    if "name" in data:
+        user["name"] = data["name"]
+    if "email" in data:
+        user["email"] = data["email"]
+    _search_keys[user_id] = _search_key(user)
+
+    return {"message": "User updated successfully", "user": user}
+
+
+@app.delete("/users/{user_id}")
+def delete_user(user_id: str):
+    """ユーザー削除"""
+    if user_id not in users_db:
+        raise NotFoundError("User", user_id)
+
+    deleted_user = users_db.pop(user_id)
+    del _search_keys[user_id]
+
+    return {
+        "message": f"User {deleted_user['name']} deleted successfully",
+        "deleted_user_id": user_id,
+    }
 
 
 # Lambda エントリーポイント
-lambda_handler = create_lambda_handler(create_app)
+lambda_handler = create_lambda_handler(app)
 
 
 if __name__ == "__main__":
     # ローカルテスト用の簡単な実行
-    import json
-
     test_event = {
         "httpMethod": "GET",
         "path": "/",
@@ -143,7 +166,7 @@ if __name__ == "__main__":
         "body": None,
     }
 
-    context = type("Context", (), {"aws_request_id": "test-123"})()
+    context = SimpleNamespace(aws_request_id="test-123")
 
     result = lambda_handler(test_event, context)
-    print(json.dumps(result, indent=2, ensure_ascii=False))
+    print(JSONHandler.dumps(result, indent=2))
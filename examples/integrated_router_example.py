@@ -3,13 +3,26 @@
 複数のルーターを統合して管理する方法を示します。
 """
 
-import json
-import sys
-import os
+import secrets
+from types import MappingProxyType
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # ローカル実行時のみリポジトリ直下を import パスに追加（Lambda ではパッケージ直下に配置済み）
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from lambapi import API, Router, Response, create_lambda_handler
+from lambapi.json_handler import JSONHandler
+
+
+# CORS ヘッダー（モジュール読み込み時に一度だけ構築し、各レスポンスで共有する）
+_CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization",
+}
 
 
 # ===== 個別のルーター定義 =====
@@ -18,17 +31,30 @@ from lambapi import API, Router, Response, create_lambda_handler
 auth_router = Router()
 
 
+# デモ用の認証情報（モジュール読み込み時に一度だけ構築）
+_DEMO_USERS = MappingProxyType(
+    {
+        "admin": {
+            "password": b"password",
+            "profile": {"id": "admin-user", "username": "admin", "role": "administrator"},
+        },
+    }
+)
+
+
 @auth_router.post("/login")
 def login(request):
     """ログイン"""
     credentials = request.json()
 
-    if credentials.get("username") == "admin" and credentials.get("password") == "password":
-
+    user = _DEMO_USERS.get(credentials.get("username", ""))
+    password = str(credentials.get("password", "")).encode()
+    # 定数時間比較でタイミング攻撃を防ぐ
+    if user and secrets.compare_digest(user["password"], password):
         return {
             "token": "dummy-jwt-token",
             "expires_in": 3600,
-            "user": {"id": "admin-user", "username": "admin", "role": "administrator"},
+            "user": user["profile"],
         }
     else:
         return Response({"error": "Invalid credentials"}, status_code=401)
@@ -43,17 +69,21 @@ def logout(request):
 # パブリックルーター
 public_router = Router()
 
+# 固定レスポンスはインポート時に一度だけシリアライズしておく
+_HEALTH_BODY = JSONHandler.dumps({"status": "ok", "service": "lambapi"})
+_VERSION_BODY = JSONHandler.dumps({"version": "1.0.0", "api": "lambapi"})
+
 
 @public_router.get("/health")
 def health_check(request):
     """ヘルスチェック"""
-    return {"status": "ok", "service": "lambapi"}
+    return Response(_HEALTH_BODY, pre_encoded=True)
 
 
 @public_router.get("/version")
 def version_info(request):
     """バージョン情報"""
-    return {"version": "1.0.0", "api": "lambapi"}
+    return Response(_VERSION_BODY, pre_encoded=True)
 
 
 # 支払いルーター
@@ -115,43 +145,38 @@ def generate_image(request):
 main_router = Router()
 
 # 各ルーターをプレフィックス付きで統合
-main_router.add_router(auth_router, prefix="/auth", tags=["auth"])
-main_router.add_router(public_router, prefix="/public", tags=["public"])
-main_router.add_router(payment_router, prefix="/payment", tags=["payment"])
-main_router.add_router(generate_router, prefix="/generate", tags=["generate"])
+main_router.add_router(auth_router, prefix="/auth", tags=("auth",))
+main_router.add_router(public_router, prefix="/public", tags=("public",))
+main_router.add_router(payment_router, prefix="/payment", tags=("payment",))
+main_router.add_router(generate_router, prefix="/generate", tags=("generate",))
+
+
+# ルート・ミドルウェアはモジュール読み込み時（Lambda の init フェーズ）に一度だけ登録する
+app = API()
+
 
+# CORS 設定のミドルウェア
+def cors_middleware(request, response):
+    if isinstance(response, Response):
+        response.headers.update(_CORS_HEADERS)
+    return response
 
-def create_app(event, context):
-    """アプリケーション作成関数"""
-    app = API(event, context)
 
-    # CORS 設定のミドルウェア
-    def cors_middleware(request, response):
-        if isinstance(response, Response):
-            response.headers.update(
-                {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-                    "Access-Control-Allow-Headers": "Content-Type, Authorization",
-                }
-            )
-        return response
+app.add_middleware(cors_middleware)
 
-    app.add_middleware(cors_middleware)
 
-    # ルート直接定義
-    @app.get("/")
-    def root(request):
-        return {"message": "Welcome to integrated router API"}
+# ルート直接定義
+@app.get("/")
+def root(request):
+    return {"message": "Welcome to integrated router API"}
 
-    # 統合されたルーターを登録
-    app.add_router(main_router)
 
-    return app
+# 統合されたルーターを登録
+app.add_router(main_router)
 
 
 # Lambda 関数のエントリーポイント
-lambda_handler = create_lambda_handler(create_app)
+lambda_handler = create_lambda_handler(app)
 
 
 # ローカルテスト用コード
@@ -166,8 +191,8 @@ if __name__ == "__main__":
     }
 
     print("=== Test 1: Root ===")
-    result1 = lambda_handler(test_event_1, None)
-    print(json.dumps(result1, indent=2, ensure_ascii=False))
+    result1 = app.dispatch(test_event_1)
+    print(JSONHandler.dumps(result1, indent=2))
 
     # テストケース 2: 認証ログイン
     test_event_2 = {
@@ -175,12 +200,12 @@ if __name__ == "__main__":
         "path": "/auth/login",
         "queryStringParameters": None,
         "headers": {"Content-Type": "application/json"},
-        "body": json.dumps({"username": "admin", "password": "password"}),
+        "body": JSONHandler.dumps({"username": "admin", "password": "password"}),
     }
 
     print("\n=== Test 2: Auth Login ===")
-    result2 = lambda_handler(test_event_2, None)
-    print(json.dumps(result2, indent=2, ensure_ascii=False))
+    result2 = app.dispatch(test_event_2)
+    print(JSONHandler.dumps(result2, indent=2))
 
     # テストケース 3: パブリックヘルスチェック
     test_event_3 = {
@@ -192,8 +217,8 @@ if __name__ == "__main__":
     }
 
     print("\n=== Test 3: Public Health ===")
-    result3 = lambda_handler(test_event_3, None)
-    print(json.dumps(result3, indent=2, ensure_ascii=False))
+    result3 = app.dispatch(test_event_3)
+    print(JSONHandler.dumps(result3, indent=2))
 
     # テストケース 4: 支払い処理
     test_event_4 = {
@@ -201,12 +226,12 @@ if __name__ == "__main__":
         "path": "/payment/charge",
         "queryStringParameters": None,
         "headers": {"Content-Type": "application/json"},
-        "body": json.dumps({"amount": 5000, "currency": "jpy"}),
+        "body": JSONHandler.dumps({"amount": 5000, "currency": "jpy"}),
     }
 
     print("\n=== Test 4: Payment Charge ===")
-    result4 = lambda_handler(test_event_4, None)
-    print(json.dumps(result4, indent=2, ensure_ascii=False))
+    result4 = app.dispatch(test_event_4)
+    print(JSONHandler.dumps(result4, indent=2))
 
     # テストケース 5: テキスト生成
     test_event_5 = {
@@ -214,9 +239,9 @@ if __name__ == "__main__":
         "path": "/generate/text",
         "queryStringParameters": None,
         "headers": {"Content-Type": "application/json"},
-        "body": json.dumps({"prompt": "Write a story about AI"}),
+        "body": JSONHandler.dumps({"prompt": "Write a story about AI"}),
     }
 
     print("\n=== Test 5: Generate Text ===")
-    result5 = lambda_handler(test_event_5, None)
-    print(json.dumps(result5, indent=2, ensure_ascii=False))
+    result5 = app.dispatch(test_event_5)
+    print(JSONHandler.dumps(result5, indent=2))
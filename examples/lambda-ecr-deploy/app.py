@@ -6,63 +6,226 @@ Lambda ECR デプロイ用のサンプルアプリケーション
 import os
 import json
 import logging
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-from lambapi import API, Response, create_lambda_handler
+from functools import lru_cache
+from operator import attrgetter
+from types import SimpleNamespace
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from lambapi import (
+    API,
+    Response,
+    create_cors_config,
+    create_lambda_handler,
+    default_error_handler,
+    error_handler,
+)
 from lambapi.exceptions import ValidationError, NotFoundError
+from lambapi.json_handler import JSONHandler
 
-# 構造化ログ設定
-logging.basicConfig(
-    level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
-    format=(
-        json.dumps(
-            {
-                "timestamp": "%(asctime) s",
-                "level": "%(levelname) s",
-                "logger": "%(name) s",
-                "message": "%(message) s",
-            }
+
+class JsonLogFormatter(logging.Formatter):
+    """1 行 JSON 形式のログフォーマッター
+
+    書式文字列の % 展開を経由せずに JSON 行を直接組み立てる。
+    メッセージと例外情報はエスケープするため、引用符を含んでも壊れない。
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = (
+            f'{{"timestamp":"{self.formatTime(record)}","level":"{record.levelname}",'
+            f'"logger":"{record.name}","message":{json.dumps(record.getMessage())}'
         )
-        if os.getenv("LOG_FORMAT") == "json"
-        else "%(asctime) s - %(name) s - %(levelname) s - %(message) s"
-    ),
-)
+        if record.exc_info:
+            line += f',"exc_info":{json.dumps(self.formatException(record.exc_info))}'
+        return line + "}"
+
+
+# 構造化ログ設定
+_LOG_LEVEL = getattr(logging, os.getenv("LOG_LEVEL", "INFO"))
+if os.getenv("LOG_FORMAT") == "json":
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(JsonLogFormatter())
+    logging.basicConfig(level=_LOG_LEVEL, handlers=[_log_handler])
+else:
+    logging.basicConfig(
+        level=_LOG_LEVEL, format="%(asctime) s - %(name) s - %(levelname) s - %(message) s"
+    )
 logger = logging.getLogger(__name__)
 
+# 直近に整形した時刻（エポック秒, ISO 文字列）。同じ秒の間は整形済みの文字列を再利用する
+_NOW_ISO_CACHE: List[Any] = [0, ""]
+
+
+def now_iso() -> str:
+    """現在時刻を ISO 8601 形式で取得（秒単位でキャッシュ）"""
+    now = int(time.time())
+    if now != _NOW_ISO_CACHE[0]:
+        _NOW_ISO_CACHE[:] = [now, datetime.fromtimestamp(now).isoformat()]
+    return _NOW_ISO_CACHE[1]
+
+
+@dataclass(slots=True)
+class User:
+    """ユーザーレコード（属性をスロットに保持し、辞書よりも省メモリかつ高速に参照できる）"""
+
+    id: str
+    name: str
+    email: str
+    age: int
+    role: str
+    created_at: str
+    profile: Optional[Dict[str, Any]] = None
+
+    def to_dict(self, include_profile: bool = True) -> Dict[str, Any]:
+        """レスポンス用の辞書に変換（プロフィール未設定の場合は profile キーを含めない）"""
+        data = {
+            "id": self.id,
+            "name": self.name,
+            "email": self.email,
+            "age": self.age,
+            "role": self.role,
+            "created_at": self.created_at,
+        }
+        if include_profile and self.profile is not None:
+            data["profile"] = self.profile
+        return data
+
+
 # グローバル変数（Lambda コンテナ再利用のため）
-USERS_DB: Dict[str, Dict] = {}
+USERS_DB: Dict[str, User] = {}
 PRODUCTS_DB: Dict[str, Dict] = {}
+# ユーザー ID -> 検索用の小文字化済みキー（登録時に一度だけ計算する）
+USERS_SEARCH_INDEX: Dict[str, str] = {}
+# 登録済みメールアドレス（小文字化済み、重複チェックを O(1) で行うため）
+EMAIL_INDEX: Set[str] = set()
+# (ソートキー, 降順) -> 並び替え済みユーザー一覧（ユーザー登録時に破棄する）
+USERS_SORT_CACHE: Dict[Tuple[Optional[str], bool], List[User]] = {}
+USER_SORT_FIELDS = ("name", "age", "created_at")
+# メトリクス用の集計値（データ登録時に更新し、/metrics では全件を走査しない）
+USER_ROLE_COUNTS: Counter = Counter()
+PRODUCT_STATS: Counter = Counter()
+# ユーザー作成時の入力チェック（フィールド名, 判定関数, エラーメッセージ）
+USER_ROLES = frozenset({"admin", "user", "moderator"})
+USER_VALIDATION_RULES = (
+    ("name", lambda name: bool(name) and len(name) >= 2, "Name must be at least 2 characters"),
+    ("email", lambda email: bool(email) and "@" in email, "Valid email is required"),
+    ("age", lambda age: isinstance(age, int) and 0 <= age <= 150, "Age must be between 0 and 150"),
+    ("role", lambda role: not role or role in USER_ROLES, "Role must be admin, user, or moderator"),
+)
+# 商品絞り込み用の行データ（価格, 在庫数, カテゴリ, 商品）。商品投入時に一度だけ構築する
+PRODUCT_FILTER_ROWS: List[Tuple[float, int, Optional[str], Dict]] = []
+
+
+def index_users(users: Iterable[User]) -> None:
+    """ユーザーの検索キーとメールアドレスをインデックスに登録
+
+    一覧のキャッシュは登録件数にかかわらず最後に一度だけ破棄する。
+    """
+    for user in users:
+        department = (user.profile or {}).get("department", "")
+        USERS_SEARCH_INDEX[user.id] = f"{user.name}\0{user.email}\0{department}".lower()
+        EMAIL_INDEX.add(user.email.lower())
+        USER_ROLE_COUNTS[user.role] += 1
+    USERS_SORT_CACHE.clear()
+    get_users_page.cache_clear()
+
+
+def get_sorted_users(sort_by: str, reverse: bool) -> List[User]:
+    """並び替え済みのユーザー一覧を取得（データが変わるまでは並び替え結果を再利用）"""
+    field = sort_by if sort_by in USER_SORT_FIELDS else None
+    key = (field, reverse)
+    users = USERS_SORT_CACHE.get(key)
+    if users is None:
+        users = list(USERS_DB.values())
+        if field is not None:
+            users.sort(key=attrgetter(field), reverse=reverse)
+        USERS_SORT_CACHE[key] = users
+    return users
+
+
+@lru_cache(maxsize=128)
+def get_users_page(
+    limit: int, offset: int, search: str, role: str, sort_by: str, sort_order: str
+) -> Tuple[str, int, int]:
+    """ユーザー一覧ページをシリアライズ済み JSON で取得
+
+    同じクエリはデータが更新されるまで結果を再利用する（ユーザー登録時にキャッシュを破棄）。
+    戻り値は (レスポンスボディ, 返却件数, 総件数)。
+    """
+    # ソート（並び替え結果はキャッシュされ、データ更新まで再ソートしない）
+    reverse = sort_order.lower() == "desc"
+    sorted_users = get_sorted_users(sort_by, reverse)
+
+    # フィルタリング（事前計算した検索キーを使い、条件をまとめて 1 回の走査で判定）
+    search_lc = search.lower()
+    users = [
+        user
+        for user in sorted_users
+        if (not search or search_lc in USERS_SEARCH_INDEX[user.id])
+        and (not role or user.role == role)
+    ]
+
+    # ページネーション
+    total = len(users)
+    paginated_users = [user.to_dict() for user in users[offset : offset + limit]]
+
+    body = JSONHandler.dumps(
+        {
+            "users": paginated_users,
+            "pagination": {
+                "total": total,
+                "limit": limit,
+                "offset": offset,
+                "has_more": offset + limit < total,
+                "next_offset": offset + limit if offset + limit < total else None,
+            },
+            "filters": {
+                "search": search or None,
+                "role": role or None,
+                "sort_by": sort_by,
+                "sort_order": sort_order,
+            },
+        }
+    )
+    return body, len(paginated_users), total
 
 
 def init_sample_data():
     """サンプルデータの初期化（初回実行時のみ）"""
-    # グローバル変数を初期化
+    # グローバル変数を初期化（同時に投入するデータの作成日時は 1 回だけ取得する）
 
     if not USERS_DB:
+        created_at = now_iso()
         USERS_DB.update(
             {
-                "1": {
-                    "id": "1",
-                    "name": "Alice Johnson",
-                    "email": "alice@example.com",
-                    "age": 28,
-                    "role": "admin",
-                    "created_at": datetime.now().isoformat(),
-                    "profile": {"department": "Engineering", "skills": ["Python", "AWS", "Docker"]},
-                },
-                "2": {
-                    "id": "2",
-                    "name": "Bob Smith",
-                    "email": "bob@example.com",
-                    "age": 32,
-                    "role": "user",
-                    "created_at": datetime.now().isoformat(),
-                    "profile": {"department": "Marketing", "skills": ["Analytics", "SEO"]},
-                },
+                "1": User(
+                    id="1",
+                    name="Alice Johnson",
+                    email="alice@example.com",
+                    age=28,
+                    role="admin",
+                    created_at=created_at,
+                    profile={"department": "Engineering", "skills": ["Python", "AWS", "Docker"]},
+                ),
+                "2": User(
+                    id="2",
+                    name="Bob Smith",
+                    email="bob@example.com",
+                    age=32,
+                    role="user",
+                    created_at=created_at,
+                    profile={"department": "Marketing", "skills": ["Analytics", "SEO"]},
+                ),
             }
         )
+        index_users(USERS_DB.values())
 
     if not PRODUCTS_DB:
+        created_at = now_iso()
         PRODUCTS_DB.update(
             {
                 "1": {
@@ -72,7 +235,7 @@ def init_sample_data():
                     "price": 299.99,
                     "category": "widgets",
                     "inventory": 150,
-                    "created_at": datetime.now().isoformat(),
+                    "created_at": created_at,
                 },
                 "2": {
                     "id": "2",
@@ -81,85 +244,110 @@ def init_sample_data():
                     "price": 49.99,
                     "category": "tools",
                     "inventory": 500,
-                    "created_at": datetime.now().isoformat(),
+                    "created_at": created_at,
                 },
             }
         )
+        PRODUCT_FILTER_ROWS.extend(
+            (p.get("price", 0), p.get("inventory", 0), p.get("category"), p)
+            for p in PRODUCTS_DB.values()
+        )
+        PRODUCT_STATS["inventory"] = sum(row[1] for row in PRODUCT_FILTER_ROWS)
 
-    logger.info(f"Initialized sample data: {len(USERS_DB)} users, {len(PRODUCTS_DB)} products")
+    logger.info("Initialized sample data: %d users, %d products", len(USERS_DB), len(PRODUCTS_DB))
 
 
-def create_app(event, context):
-    """lambapi アプリケーションを作成"""
+# サンプルデータはモジュール読み込み時（Lambda の init フェーズ）に一度だけ初期化する
+init_sample_data()
+
+# ルートレスポンスの固定部分はインポート時に一度だけシリアライズしておく
+# （末尾の "}" を除いておき、リクエストごとの値だけを連結する）
+_ROOT_STATIC_PREFIX = JSONHandler.dumps(
+    {
+        "service": "lambapi Advanced API",
+        "version": "2.0.0",
+        "environment": os.getenv("ENVIRONMENT", "development"),
+        "deployment": "ECR Container",
+    }
+)[:-1]
 
-    # サンプルデータの初期化
-    init_sample_data()
+# ヘルスチェックの環境情報はコンテナ内で変わらないため、インポート時に読み込みシリアライズしておく
+# （先頭の "{" を除き、system オブジェクトの末尾にそのまま連結できる形で保持する）
+_HEALTH_ENVIRONMENT = os.getenv("ENVIRONMENT")
+_HEALTH_SYSTEM_SUFFIX = JSONHandler.dumps(
+    {"environment": _HEALTH_ENVIRONMENT, "log_level": os.getenv("LOG_LEVEL", "INFO")}
+)[1:]
 
-    app = API(event, context)
 
-    # 環境別 CORS 設定
-    cors_origins = (
+# 環境別 CORS 設定（コールドスタート時に一度だけ構築し、固定ヘッダーのキャッシュも使い回す）
+CORS_CONFIG = create_cors_config(
+    origins=(
         ["*"]
         if os.getenv("ENVIRONMENT") == "development"
         else ["https://myapp.com", "https://www.myapp.com", "https://admin.myapp.com"]
-    )
+    ),
+    methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
+    headers=["Content-Type", "Authorization", "X-Api-Key"],
+    allow_credentials=True,
+    max_age=3600,
+)
 
-    app.enable_cors(
-        origins=cors_origins,
-        methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-        headers=["Content-Type", "Authorization", "X-Api-Key"],
-        allow_credentials=True,
-        max_age=3600,
-    )
+
+def create_app(event, context):
+    """lambapi アプリケーションを作成"""
+    app = API(event, context, cors_config=CORS_CONFIG)
 
     # ========== システム系エンドポイント ==========
 
     @app.get("/")
     def root():
         """ルートエンドポイント"""
-        return {
-            "service": "lambapi Advanced API",
-            "version": "2.0.0",
-            "environment": os.getenv("ENVIRONMENT", "development"),
-            "deployment": "ECR Container",
-            "function_name": context.function_name,
-            "request_id": context.aws_request_id,
-            "memory_limit": f"{context.memory_limit_in_mb}MB",
-            "remaining_time": f"{context.get_remaining_time_in_millis()}ms",
-        }
+        dynamic = JSONHandler.dumps(
+            {
+                "function_name": context.function_name,
+                "request_id": context.aws_request_id,
+                "memory_limit": f"{context.memory_limit_in_mb}MB",
+                "remaining_time": f"{context.get_remaining_time_in_millis()}ms",
+            }
+        )
+        return Response(f"{_ROOT_STATIC_PREFIX},{dynamic[1:]}", pre_encoded=True)
 
     @app.get("/health")
     def health_check():
         """詳細なヘルスチェック"""
         try:
             # 各種チェック
+            remaining_time = context.get_remaining_time_in_millis()
             checks = {
                 "database": len(USERS_DB) > 0,  # 実際は DB 接続チェック
-                "memory": context.get_remaining_time_in_millis() > 5000,
-                "environment": os.getenv("ENVIRONMENT") is not None,
+                "memory": remaining_time > 5000,
+                "environment": _HEALTH_ENVIRONMENT is not None,
             }
 
             all_healthy = all(checks.values())
 
-            return Response(
+            # 動的な値だけをシリアライズし、末尾の "}}" を外して固定の環境情報を連結する
+            dynamic = JSONHandler.dumps(
                 {
                     "status": "healthy" if all_healthy else "degraded",
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": now_iso(),
                     "checks": checks,
                     "system": {
                         "memory_limit": f"{context.memory_limit_in_mb}MB",
-                        "remaining_time": f"{context.get_remaining_time_in_millis()}ms",
-                        "environment": os.getenv("ENVIRONMENT"),
-                        "log_level": os.getenv("LOG_LEVEL", "INFO"),
+                        "remaining_time": f"{remaining_time}ms",
                     },
-                },
+                }
+            )
+            return Response(
+                f"{dynamic[:-2]},{_HEALTH_SYSTEM_SUFFIX}}}",
                 status_code=200 if all_healthy else 503,
+                pre_encoded=True,
             )
 
         except Exception as e:
-            logger.error(f"Health check failed: {e}")
+            logger.error("Health check failed: %s", e)
             return Response(
-                {"status": "unhealthy", "error": str(e), "timestamp": datetime.now().isoformat()},
+                {"status": "unhealthy", "error": str(e), "timestamp": now_iso()},
                 status_code=503,
             )
 
@@ -170,13 +358,13 @@ def create_app(event, context):
             "users": {
                 "total": len(USERS_DB),
                 "by_role": {
-                    "admin": len([u for u in USERS_DB.values() if u.get("role") == "admin"]),
-                    "user": len([u for u in USERS_DB.values() if u.get("role") == "user"]),
+                    "admin": USER_ROLE_COUNTS["admin"],
+                    "user": USER_ROLE_COUNTS["user"],
                 },
             },
             "products": {
                 "total": len(PRODUCTS_DB),
-                "total_inventory": sum(p.get("inventory", 0) for p in PRODUCTS_DB.values()),
+                "total_inventory": PRODUCT_STATS["inventory"],
                 "by_category": {},
             },
             "system": {
@@ -197,71 +385,26 @@ def create_app(event, context):
         sort_order: str = "asc",
     ):
         """高度なフィルタリング付きユーザー一覧"""
-        users = list(USERS_DB.values())
+        body, count, total = get_users_page(limit, offset, search, role, sort_by, sort_order)
 
-        # フィルタリング
-        if search:
-            users = [
-                user
-                for user in users
-                if search.lower() in user["name"].lower()
-                or search.lower() in user["email"].lower()
-                or search.lower() in user.get("profile", {}).get("department", "").lower()
-            ]
-
-        if role:
-            users = [user for user in users if user.get("role") == role]
-
-        # ソート
-        reverse = sort_order.lower() == "desc"
-        if sort_by == "name":
-            users.sort(key=lambda u: u["name"], reverse=reverse)
-        elif sort_by == "age":
-            users.sort(key=lambda u: u["age"], reverse=reverse)
-        elif sort_by == "created_at":
-            users.sort(key=lambda u: u["created_at"], reverse=reverse)
+        logger.info("Retrieved %d users (total: %d)", count, total)
 
-        # ページネーション
-        total = len(users)
-        paginated_users = users[offset : offset + limit]
-
-        logger.info(f"Retrieved {len(paginated_users)} users (total: {total})")
-
-        return {
-            "users": paginated_users,
-            "pagination": {
-                "total": total,
-                "limit": limit,
-                "offset": offset,
-                "has_more": offset + limit < total,
-                "next_offset": offset + limit if offset + limit < total else None,
-            },
-            "filters": {
-                "search": search or None,
-                "role": role or None,
-                "sort_by": sort_by,
-                "sort_order": sort_order,
-            },
-        }
+        return Response(body, pre_encoded=True)
 
     @app.get("/users/{user_id}")
     def get_user(user_id: str, include_profile: bool = True):
         """詳細なユーザー情報取得"""
-        if user_id not in USERS_DB:
-            logger.warning(f"User not found: {user_id}")
+        user = USERS_DB.get(user_id)
+        if user is None:
+            logger.warning("User not found: %s", user_id)
             raise NotFoundError("User", user_id)
 
-        user = USERS_DB[user_id].copy()
-
-        if not include_profile:
-            user.pop("profile", None)
-
-        logger.info(f"Retrieved user: {user_id}")
+        logger.info("Retrieved user: %s", user_id)
 
         return {
-            "user": user,
+            "user": user.to_dict(include_profile),
             "metadata": {
-                "retrieved_at": datetime.now().isoformat(),
+                "retrieved_at": now_iso(),
                 "include_profile": include_profile,
             },
         }
@@ -271,51 +414,41 @@ def create_app(event, context):
         """高度なバリデーション付きユーザー作成"""
         data = request.json()
 
-        # 詳細バリデーション
-        errors = []
-
-        if not data.get("name") or len(data["name"]) < 2:
-            errors.append({"field": "name", "message": "Name must be at least 2 characters"})
-
-        if not data.get("email") or "@" not in data["email"]:
-            errors.append({"field": "email", "message": "Valid email is required"})
-
-        if not isinstance(data.get("age"), int) or data["age"] < 0 or data["age"] > 150:
-            errors.append({"field": "age", "message": "Age must be between 0 and 150"})
-
-        if data.get("role") and data["role"] not in ["admin", "user", "moderator"]:
-            errors.append({"field": "role", "message": "Role must be admin, user, or moderator"})
+        # 詳細バリデーション（モジュール読み込み時に定義したルールを順に適用）
+        errors = [
+            {"field": field, "message": message}
+            for field, is_valid, message in USER_VALIDATION_RULES
+            if not is_valid(data.get(field))
+        ]
 
         if errors:
-            raise ValidationError("Validation failed", field="multiple", details=errors)
+            raise ValidationError("Validation failed", field="multiple", details={"errors": errors})
 
         # メール重複チェック
-        for existing_user in USERS_DB.values():
-            if existing_user["email"].lower() == data["email"].lower():
-                raise ValidationError("Email already exists", field="email", value=data["email"])
+        if data["email"].lower() in EMAIL_INDEX:
+            raise ValidationError("Email already exists", field="email", value=data["email"])
 
         # ユーザー作成
-        import uuid
-
         user_id = str(uuid.uuid4())
 
-        user = {
-            "id": user_id,
-            "name": data["name"],
-            "email": data["email"],
-            "age": data["age"],
-            "role": data.get("role", "user"),
-            "created_at": datetime.now().isoformat(),
-            "profile": data.get("profile", {}),
-        }
+        user = User(
+            id=user_id,
+            name=data["name"],
+            email=data["email"],
+            age=data["age"],
+            role=data.get("role", "user"),
+            created_at=now_iso(),
+            profile=data.get("profile", {}),
+        )
 
         USERS_DB[user_id] = user
-        logger.info(f"Created user: {user_id} ({user['email']})")
+        index_users((user,))
+        logger.info("Created user: %s (%s)", user_id, user.email)
 
         return Response(
             {
                 "message": "User created successfully",
-                "user": user,
+                "user": user.to_dict(),
                 "links": {
                     "self": f"/users/{user_id}",
                     "update": f"/users/{user_id}",
@@ -337,19 +470,14 @@ def create_app(event, context):
         in_stock: bool = None,
     ):
         """商品一覧取得"""
-        products = list(PRODUCTS_DB.values())
-
-        # フィルタリング
-        if category:
-            products = [p for p in products if p.get("category") == category]
-
-        products = [p for p in products if min_price <= p.get("price", 0) <= max_price]
-
-        if in_stock is not None:
-            if in_stock:
-                products = [p for p in products if p.get("inventory", 0) > 0]
-            else:
-                products = [p for p in products if p.get("inventory", 0) == 0]
+        # フィルタリング（事前に取り出した列の値で 1 回の走査でまとめて判定）
+        products = [
+            product
+            for price, inventory, product_category, product in PRODUCT_FILTER_ROWS
+            if (not category or product_category == category)
+            and min_price <= price <= max_price
+            and (in_stock is None or (inventory > 0 if in_stock else inventory == 0))
+        ]
 
         # ページネーション
         total = len(products)
@@ -402,104 +530,119 @@ def create_app(event, context):
         if not users_data or len(users_data) > 100:
             raise ValidationError("Must provide 1-100 users for batch creation")
 
-        results = {"created": [], "errors": [], "summary": {"success": 0, "failed": 0}}
+        # 同一バッチのユーザーは同じ作成日時とし、ループ内で毎回時刻を取得しない
+        created_at = now_iso()
+        new_users: Dict[str, User] = {}
+        batch_emails: Set[str] = set()
+        errors = []
 
         for i, user_data in enumerate(users_data):
             try:
                 # 簡単なバリデーション
                 if not user_data.get("name") or not user_data.get("email"):
                     raise ValueError("Name and email are required")
+                email_lc = user_data["email"].lower()
+                if email_lc in EMAIL_INDEX or email_lc in batch_emails:
+                    raise ValueError("Email already exists")
 
                 # ユーザー作成
-                import uuid
-
                 user_id = str(uuid.uuid4())
-                user = {
-                    "id": user_id,
-                    "name": user_data["name"],
-                    "email": user_data["email"],
-                    "age": user_data.get("age", 0),
-                    "role": user_data.get("role", "user"),
-                    "created_at": datetime.now().isoformat(),
-                }
-
-                USERS_DB[user_id] = user
-                results["created"].append(user)
-                results["summary"]["success"] += 1
+                new_users[user_id] = User(
+                    id=user_id,
+                    name=user_data["name"],
+                    email=user_data["email"],
+                    age=user_data.get("age", 0),
+                    role=user_data.get("role", "user"),
+                    created_at=created_at,
+                )
+                batch_emails.add(email_lc)
 
             except Exception as e:
-                results["errors"].append({"index": i, "data": user_data, "error": str(e)})
-                results["summary"]["failed"] += 1
+                errors.append({"index": i, "data": user_data, "error": str(e)})
 
-        status_code = 201 if results["summary"]["success"] > 0 else 400
+        # 検証を通過したユーザーはまとめて登録し、インデックスとキャッシュも一度に更新する
+        USERS_DB.update(new_users)
+        index_users(new_users.values())
+
+        results = {
+            "created": [user.to_dict() for user in new_users.values()],
+            "errors": errors,
+            "summary": {"success": len(new_users), "failed": len(errors)},
+        }
+        status_code = 201 if new_users else 400
 
         return Response(results, status_code=status_code)
 
-    # ========== エラーハンドリング ==========
+    return app
+
+
+# ========== エラーハンドリング ==========
+# エラーハンドラーはグローバルレジストリに一度だけ登録し、全呼び出しで共有する
 
-    @app.error_handler(ValidationError)
-    def handle_validation_error(error, request, context):
-        """バリデーションエラーの詳細処理"""
-        logger.warning(f"Validation error: {error}")
 
+@error_handler(ValidationError)
+def handle_validation_error(error, request, context):
+    """バリデーションエラーの詳細処理"""
+    logger.warning("Validation error: %s", error)
+
+    return Response(
+        {
+            "error": "VALIDATION_ERROR",
+            "message": str(error),
+            "details": getattr(error, "details", None),
+            "field": getattr(error, "field", None),
+            "value": getattr(error, "value", None),
+            "request_id": context.aws_request_id,
+            "timestamp": now_iso(),
+        },
+        status_code=400,
+    )
+
+
+@error_handler(NotFoundError)
+def handle_not_found_error(error, request, context):
+    """リソース未発見エラーの処理"""
+    logger.info("Resource not found: %s", error)
+
+    return Response(
+        {
+            "error": "NOT_FOUND",
+            "message": str(error),
+            "request_id": context.aws_request_id,
+            "timestamp": now_iso(),
+        },
+        status_code=404,
+    )
+
+
+@default_error_handler
+def handle_general_error(error, request, context):
+    """一般的なエラーの処理"""
+    logger.error("Unhandled error: %s", error, exc_info=True)
+
+    # 本番環境では詳細なエラー情報を隠す
+    if os.getenv("ENVIRONMENT") == "production":
         return Response(
             {
-                "error": "VALIDATION_ERROR",
-                "message": str(error),
-                "details": getattr(error, "details", None),
-                "field": getattr(error, "field", None),
-                "value": getattr(error, "value", None),
+                "error": "INTERNAL_ERROR",
+                "message": "An internal error occurred",
                 "request_id": context.aws_request_id,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
             },
-            status_code=400,
+            status_code=500,
         )
-
-    @app.error_handler(NotFoundError)
-    def handle_not_found_error(error, request, context):
-        """リソース未発見エラーの処理"""
-        logger.info(f"Resource not found: {error}")
-
+    else:
         return Response(
             {
-                "error": "NOT_FOUND",
+                "error": "INTERNAL_ERROR",
                 "message": str(error),
+                "type": type(error).__name__,
                 "request_id": context.aws_request_id,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
             },
-            status_code=404,
+            status_code=500,
         )
 
-    @app.default_error_handler
-    def handle_general_error(error, request, context):
-        """一般的なエラーの処理"""
-        logger.error(f"Unhandled error: {error}", exc_info=True)
-
-        # 本番環境では詳細なエラー情報を隠す
-        if os.getenv("ENVIRONMENT") == "production":
-            return Response(
-                {
-                    "error": "INTERNAL_ERROR",
-                    "message": "An internal error occurred",
-                    "request_id": context.aws_request_id,
-                    "timestamp": datetime.now().isoformat(),
-                },
-                status_code=500,
-            )
-        else:
-            return Response(
-                {
-                    "error": "INTERNAL_ERROR",
-                    "message": str(error),
-                    "type": type(error).__name__,
-                    "request_id": context.aws_request_id,
-                    "timestamp": datetime.now().isoformat(),
-                },
-                status_code=500,
-            )
-
-    return app
-
 
 # Lambda ハンドラー
 lambda_handler = create_lambda_handler(create_app)
@@ -527,16 +670,15 @@ if __name__ == "__main__":
     ]
 
     # コンテキストモック
-    context = type(
-        "Context",
-        (),
-        {
-            "aws_request_id": "test-request-id",
-            "function_name": "test-lambapi-container",
-            "memory_limit_in_mb": "512",
-            "get_remaining_time_in_millis": lambda: 25000,
-        },
-    )()
+    context = SimpleNamespace(
+        aws_request_id="test-request-id",
+        function_name="test-lambapi-container",
+        memory_limit_in_mb="512",
+        get_remaining_time_in_millis=lambda: 25000,
+    )
+
+    # ルート登録は一度だけ行い、各テストイベントは dispatch で処理する
+    app = create_app({}, context)
 
     # テスト実行
     for i, event in enumerate(test_events, 1):
@@ -546,11 +688,12 @@ if __name__ == "__main__":
             print(f"Query: {event['queryStringParameters']}")
         print("=" * 60)
 
-        result = lambda_handler(event, context)
+        result = app.dispatch(event, context)
         print(f"ステータス: {result['statusCode']}")
 
-        try:
-            body = json.loads(result["body"])
-            print(f"レスポンス: {json.dumps(body, indent=2, ensure_ascii=False)}")
-        except (json.JSONDecodeError, KeyError):
-            print(f"レスポンス: {result['body']}")
+        # JSON として解釈できないボディはそのまま表示する
+        body = JSONHandler.loads(result.get("body"))
+        if body:
+            print(f"レスポンス: {JSONHandler.dumps(body, indent=2)}")
+        else:
+            print(f"レスポンス: {result.get('body')}")
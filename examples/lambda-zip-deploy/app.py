@@ -4,7 +4,10 @@ Lambda ZIP デプロイ用のサンプルアプリケーション
 
 import os
 import logging
-from lambapi import API, Response, create_lambda_handler
+import uuid
+from itertools import islice
+from types import SimpleNamespace
+from lambapi import API, Response, create_cors_config, create_lambda_handler, default_error_handler
 from lambapi.exceptions import ValidationError, NotFoundError
 
 # ログ設定
@@ -15,17 +18,19 @@ logger = logging.getLogger(__name__)
 
 # インメモリデータストア（本番では DynamoDB などを使用）
 USERS_DB = {}
+# 登録済みメールアドレス（重複チェックを全件走査せず O(1) で行うため）
+EMAIL_INDEX = set()
+
+# CORS 設定（コールドスタート時に一度だけ構築し、呼び出しごとに共有する）
+CORS_CONFIG = create_cors_config(
+    origins=["*"] if os.getenv("ENVIRONMENT") == "development" else ["https://myapp.com"],
+    methods=["GET", "POST", "PUT", "DELETE"],
+    headers=["Content-Type", "Authorization"],
+)
 
 
 def create_app(event, context):
-    app = API(event, context)
-
-    # CORS 設定
-    app.enable_cors(
-        origins=["*"] if os.getenv("ENVIRONMENT") == "development" else ["https://myapp.com"],
-        methods=["GET", "POST", "PUT", "DELETE"],
-        headers=["Content-Type", "Authorization"],
-    )
+    app = API(event, context, cors_config=CORS_CONFIG)
 
     @app.get("/")
     def root():
@@ -51,20 +56,21 @@ def create_app(event, context):
     @app.get("/users")
     def get_users(limit: int = 10, search: str = ""):
         """ユーザー一覧取得"""
-        users = list(USERS_DB.values())
+        users = USERS_DB.values()
 
-        # 検索フィルター
+        # 検索フィルター（遅延評価し、limit 件見つかった時点で走査を打ち切る）
         if search:
-            users = [
+            search_lc = search.lower()
+            users = (
                 user
                 for user in users
-                if search.lower() in user["name"].lower() or search.lower() in user["email"].lower()
-            ]
+                if search_lc in user["name"].lower() or search_lc in user["email"].lower()
+            )
 
         # リミット適用
-        users = users[:limit]
+        users = list(islice(users, max(limit, 0)))
 
-        logger.info(f"Retrieved {len(users)} users")
+        logger.info("Retrieved %d users", len(users))
 
         return {
             "users": users,
@@ -77,11 +83,11 @@ def create_app(event, context):
     def get_user(user_id: str):
         """特定ユーザー取得"""
         if user_id not in USERS_DB:
-            logger.warning(f"User not found: {user_id}")
+            logger.warning("User not found: %s", user_id)
             raise NotFoundError("User", user_id)
 
         user = USERS_DB[user_id]
-        logger.info(f"Retrieved user: {user_id}")
+        logger.info("Retrieved user: %s", user_id)
 
         return {"user": user}
 
@@ -99,13 +105,10 @@ def create_app(event, context):
             raise ValidationError("Age must be a positive integer", field="age")
 
         # メール重複チェック
-        for existing_user in USERS_DB.values():
-            if existing_user["email"] == data["email"]:
-                raise ValidationError("Email already exists", field="email", value=data["email"])
+        if data["email"] in EMAIL_INDEX:
+            raise ValidationError("Email already exists", field="email", value=data["email"])
 
         # ユーザー作成
-        import uuid
-
         user_id = str(uuid.uuid4())
         user = {
             "id": user_id,
@@ -116,7 +119,8 @@ def create_app(event, context):
         }
 
         USERS_DB[user_id] = user
-        logger.info(f"Created user: {user_id}")
+        EMAIL_INDEX.add(user["email"])
+        logger.info("Created user: %s", user_id)
 
         return Response({"message": "User created successfully", "user": user}, status_code=201)
 
@@ -134,15 +138,16 @@ def create_app(event, context):
             user["name"] = data["name"]
         if "email" in data and data["email"]:
             # メール重複チェック（自分以外）
-            for uid, existing_user in USERS_DB.items():
-                if uid != user_id and existing_user["email"] == data["email"]:
-                    raise ValidationError("Email already exists", field="email")
+            if data["email"] != user["email"] and data["email"] in EMAIL_INDEX:
+                raise ValidationError("Email already exists", field="email")
+            EMAIL_INDEX.discard(user["email"])
+            EMAIL_INDEX.add(data["email"])
             user["email"] = data["email"]
         if "age" in data and isinstance(data["age"], int) and data["age"] >= 0:
             user["age"] = data["age"]
 
         user["updated_at"] = "2025-01-01T00:00:00Z"
-        logger.info(f"Updated user: {user_id}")
+        logger.info("Updated user: %s", user_id)
 
         return {"message": "User updated successfully", "user": user}
 
@@ -153,25 +158,27 @@ def create_app(event, context):
             raise NotFoundError("User", user_id)
 
         user = USERS_DB.pop(user_id)
-        logger.info(f"Deleted user: {user_id}")
+        EMAIL_INDEX.discard(user["email"])
+        logger.info("Deleted user: %s", user_id)
 
         return {"message": f"User {user['name']} deleted successfully", "deleted_user_id": user_id}
 
-    # エラーハンドリング
-    @app.default_error_handler
-    def handle_error(error, request, context):
-        logger.error(f"Unhandled error: {error}", exc_info=True)
+    return app
 
-        return Response(
-            {
-                "error": "Internal server error",
-                "message": "An unexpected error occurred",
-                "request_id": context.aws_request_id,
-            },
-            status_code=500,
-        )
 
-    return app
+# エラーハンドリング（グローバルレジストリに一度だけ登録）
+@default_error_handler
+def handle_error(error, request, context):
+    logger.error("Unhandled error: %s", error, exc_info=True)
+
+    return Response(
+        {
+            "error": "Internal server error",
+            "message": "An unexpected error occurred",
+            "request_id": context.aws_request_id,
+        },
+        status_code=500,
+    )
 
 
 # Lambda ハンドラー
@@ -179,8 +186,6 @@ lambda_handler = create_lambda_handler(create_app)
 
 # ローカルテスト用
 if __name__ == "__main__":
-    import json
-
     # サンプルデータ
     USERS_DB["1"] = {
         "id": "1",
@@ -196,6 +201,7 @@ if __name__ == "__main__":
         "age": 30,
         "created_at": "2025-01-01T00:00:00Z",
     }
+    EMAIL_INDEX.update(user["email"] for user in USERS_DB.values())
 
     # テストイベント
     test_events = [
@@ -211,20 +217,19 @@ if __name__ == "__main__":
     ]
 
     # コンテキストモック
-    context = type(
-        "Context",
-        (),
-        {
-            "aws_request_id": "test-request-id",
-            "function_name": "test-function",
-            "memory_limit_in_mb": "256",
-            "get_remaining_time_in_millis": lambda: 30000,
-        },
-    )()
+    context = SimpleNamespace(
+        aws_request_id="test-request-id",
+        function_name="test-function",
+        memory_limit_in_mb="256",
+        get_remaining_time_in_millis=lambda: 30000,
+    )
+
+    # ルート登録は一度だけ行い、各テストイベントは dispatch で処理する
+    app = create_app({}, context)
 
     # テスト実行
     for i, event in enumerate(test_events, 1):
         print(f"\n=== テスト {i}: {event['httpMethod']} {event['path']} ===")
-        result = lambda_handler(event, context)
+        result = app.dispatch(event, context)
         print(f"ステータス: {result['statusCode']}")
         print(f"レスポンス: {result['body']}")
@@ -4,24 +4,73 @@ lambapi ローカル開発サーバー
 API Gateway の代替として、ローカルでの開発・テスト用に使用
 """
 
-import json
 import urllib.parse
 from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse, unquote_plus
 import sys
 import os
-
-# アプリケーションのインポート（app.py があることを前提）
-try:
-    from app import lambda_handler
-except ImportError:
-    print("Error: app.py が見つかりません。lambda_handler を含む app.py を作成してください。")
-    sys.exit(1)
+from types import SimpleNamespace
+
+# orjson が利用可能ならそちらでシリアライズされる
+from lambapi.json_handler import JSONHandler
+
+# Lambda コンテキストのモック（内容は固定のため、全リクエストで同じインスタンスを使う）
+LOCAL_CONTEXT = SimpleNamespace(
+    aws_request_id="local-request-id",
+    log_group_name="/aws/lambda/local-function",
+    log_stream_name="2025/01/01/[$LATEST]local-stream",
+    function_name="local-function",
+    function_version="$LATEST",
+    invoked_function_arn="arn:aws:lambda:local:123456789012:function:local-function",
+    memory_limit_in_mb="128",
+    get_remaining_time_in_millis=lambda: 30000,
+)
+
+# 全レスポンス共通の開発用 CORS ヘッダー
+DEV_CORS_HEADERS = (
+    ("Access-Control-Allow-Origin", "*"),
+    ("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, PATCH, OPTIONS"),
+    ("Access-Control-Allow-Headers", "Content-Type, Authorization"),
+)
+# ハンドラーが Content-Type を指定しなかった場合の既定値
+DEFAULT_CONTENT_TYPE = "application/json"
+
+
+def parse_query_string(query):
+    """クエリ文字列を Lambda 形式（キーごとに最初の値のみ）の辞書に変換
+
+    parse_qs と同じく空の値は無視するが、キーごとのリストを作らずに 1 回の走査で組み立てる。
+    """
+    params = {}
+    if query:
+        for part in query.split("&"):
+            key, _, value = part.partition("=")
+            if not value:
+                continue
+            key = unquote_plus(key)
+            if key not in params:
+                params[key] = unquote_plus(value)
+    return params
+
+
+def headers_to_dict(message):
+    """HTTPMessage を辞書に変換
+
+    dict(HTTPMessage) はキーごとに全ヘッダーを走査するため、items() を 1 回走査して組み立てる。
+    同名ヘッダーが複数ある場合は dict(HTTPMessage) と同じく最初の値を使う。
+    """
+    headers = {}
+    for key, value in message.items():
+        headers.setdefault(key, value)
+    return headers
 
 
 class LambdaHTTPHandler(BaseHTTPRequestHandler):
     """HTTP リクエストを Lambda イベント形式に変換するハンドラー"""
 
+    # 実行する Lambda ハンドラー（start_server で設定）
+    lambda_handler = None
+
     def do_GET(self):
         self._handle_request("GET")
 
@@ -46,19 +95,14 @@ class LambdaHTTPHandler(BaseHTTPRequestHandler):
             # URL の解析
             parsed_url = urlparse(self.path)
             path = parsed_url.path
-            query_params = parse_qs(parsed_url.query)
-
-            # クエリパラメータを単一値に変換（Lambda の形式に合わせる）
-            query_string_parameters = {}
-            if query_params:
-                for key, values in query_params.items():
-                    query_string_parameters[key] = values[0] if values else ""
+            query_string_parameters = parse_query_string(parsed_url.query)
 
             # リクエストボディの読み取り
             content_length = int(self.headers.get("Content-Length", 0))
             body = None
             if content_length > 0:
-                body = self.rfile.read(content_length).decode("utf-8")
+                # Content-Length 分を一度で読み込み、デコードは request.body 参照時まで遅延する
+                body = self.rfile.read(content_length)
 
             # Lambda イベントの構築
             event = {
@@ -67,7 +111,7 @@ class LambdaHTTPHandler(BaseHTTPRequestHandler):
                 "queryStringParameters": (
                     query_string_parameters if query_string_parameters else None
                 ),
-                "headers": dict(self.headers),
+                "headers": headers_to_dict(self.headers),
                 "body": body,
                 "requestContext": {
                     "requestId": "local-request-id",
@@ -85,41 +129,26 @@ class LambdaHTTPHandler(BaseHTTPRequestHandler):
                 "isBase64Encoded": False,
             }
 
-            # Lambda コンテキストの構築
-            context = type(
-                "Context",
-                (),
-                {
-                    "aws_request_id": "local-request-id",
-                    "log_group_name": "/aws/lambda/local-function",
-                    "log_stream_name": "2025/01/01/[$LATEST]local-stream",
-                    "function_name": "local-function",
-                    "function_version": "$LATEST",
-                    "invoked_function_arn": (
-                        "arn:aws:lambda:local:123456789012:function:local-function"
-                    ),
-                    "memory_limit_in_mb": "128",
-                    "remaining_time_in_millis": lambda: 30000,
-                },
-            )()
-
             # Lambda ハンドラーの実行
-            response = lambda_handler(event, context)
+            response = self.lambda_handler(event, LOCAL_CONTEXT)
 
             # HTTP レスポンスの送信
             status_code = response.get("statusCode", 200)
             headers = response.get("headers", {})
             body = response.get("body", "")
 
+            # ボディは先にエンコードし、シリアライズに失敗しても送信途中のレスポンスを残さない
+            if isinstance(body, str):
+                body_bytes = body.encode("utf-8")
+            else:
+                body_bytes = JSONHandler.dumps(body).encode("utf-8")
+
             # レスポンスヘッダーの設定
             self.send_response(status_code)
 
             # CORS ヘッダーの追加（開発用）
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.send_header(
-                "Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, PATCH, OPTIONS"
-            )
-            self.send_header("Access-Control-Allow-Headers", "Content-Type, Authorization")
+            for header_name, header_value in DEV_CORS_HEADERS:
+                self.send_header(header_name, header_value)
 
             # カスタムヘッダーの追加
             for header_name, header_value in headers.items():
@@ -127,15 +156,10 @@ class LambdaHTTPHandler(BaseHTTPRequestHandler):
 
             # Content-Type の設定（デフォルトは JSON）
             if "Content-Type" not in headers:
-                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Type", DEFAULT_CONTENT_TYPE)
 
             self.end_headers()
-
-            # レスポンスボディの送信
-            if isinstance(body, str):
-                self.wfile.write(body.encode("utf-8"))
-            else:
-                self.wfile.write(json.dumps(body).encode("utf-8"))
+            self.wfile.write(body_bytes)
 
             # ログ出力
             print(f"{method} {path} -> {status_code}")
@@ -147,15 +171,32 @@ class LambdaHTTPHandler(BaseHTTPRequestHandler):
             self.send_header("Content-Type", "application/json")
             self.end_headers()
             error_response = {"error": "Internal Server Error", "message": str(e)}
-            self.wfile.write(json.dumps(error_response).encode("utf-8"))
+            self.wfile.write(JSONHandler.dumps(error_response).encode("utf-8"))
 
     def log_message(self, format, *args):
         """ログメッセージの出力をカスタマイズ"""
         return  # デフォルトのログ出力を無効化
 
 
-def start_server(host="localhost", port=8000):
-    """ローカルサーバーを起動"""
+def start_server(handler, host="localhost", port=8000, legacy=False):
+    """ローカルサーバーを起動
+
+    uvicorn がインストールされていれば ASGI アダプター経由で起動する（uvloop / httptools が
+    あれば uvicorn が自動的に使用する）。未インストールまたは legacy 指定時は http.server を使う。
+    """
+    if not legacy:
+        try:
+            import uvicorn
+        except ImportError:
+            print("⚠️  uvicorn が見つからないため http.server で起動します")
+        else:
+            from lambapi.uvicorn_server import create_asgi_app
+
+            print(f"\n🚀 lambapi ローカルサーバー (uvicorn) を起動しました: http://{host}:{port}")
+            uvicorn.run(create_asgi_app(handler), host=host, port=port, log_level="warning")
+            return
+
+    LambdaHTTPHandler.lambda_handler = staticmethod(handler)
     server_address = (host, port)
     httpd = HTTPServer(server_address, LambdaHTTPHandler)
 
@@ -192,20 +233,23 @@ if __name__ == "__main__":
     parser.add_argument(
         "--app", default="app", help="アプリケーションモジュール名 (デフォルト: app)"
     )
+    parser.add_argument(
+        "--legacy", action="store_true", help="uvicorn を使わず http.server で起動する"
+    )
 
     args = parser.parse_args()
 
-    # 動的にアプリケーションをインポート
-    if args.app != "app":
-        try:
-            import importlib
-
-            app_module = importlib.import_module(args.app)
-            example_lambda_handler = app_module.lambda_handler
-        except ImportError as e:
-            print(f"Error: {args.app}.py が見つかりません: {e}")
-            sys.exit(1)
-    else:
-        example_lambda_handler = lambda_handler
-
-    start_server(example_lambda_handler, args.host, args.port)
+    # アプリケーションのインポート（起動時に一度だけ解決する）
+    try:
+        import importlib
+
+        app_module = importlib.import_module(args.app)
+        app_lambda_handler = app_module.lambda_handler
+    except ImportError as e:
+        print(f"Error: {args.app}.py が見つかりません: {e}")
+        sys.exit(1)
+    except AttributeError:
+        print(f"Error: {args.app}.py に lambda_handler が見つかりません")
+        sys.exit(1)
+
+    start_server(app_lambda_handler, args.host, args.port, args.legacy)
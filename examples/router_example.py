@@ -3,17 +3,37 @@ Router を使用した API 実装例
 ルーター機能を使用して API を構造化します。
 """
 
-import json
-import sys
-import os
+import secrets
+from types import MappingProxyType
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # ローカル実行時のみリポジトリ直下を import パスに追加（Lambda ではパッケージ直下に配置済み）
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from lambapi import API, Router, Response, create_lambda_handler
+from lambapi.json_handler import JSONHandler
+
+
+# CORS ヘッダー（モジュール読み込み時に一度だけ構築し、各レスポンスで共有する）
+_CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization",
+}
+
+
+# ユーザー詳細のテンプレート（モジュール読み込み時に一度だけ構築）
+_USER_DETAILS = {
+    "created_at": "2024-01-01T00:00:00Z",
+    "last_login": "2024-01-02T10:30:00Z",
+}
 
 
 # ユーザー関連のルーター
-user_router = Router(prefix="/users", tags=["users"])
+user_router = Router(prefix="/users", tags=("users",))
 
 
 @user_router.get("/")
@@ -32,10 +52,8 @@ def get_user(user_id: str, include_details: bool = False):
     }
 
     if include_details:
-        user_data["details"] = {
-            "created_at": "2024-01-01T00:00:00Z",
-            "last_login": "2024-01-02T10:30:00Z",
-        }
+        # 固定の詳細情報はテンプレートを複製する（リテラルから毎回組み立てない）
+        user_data["details"] = _USER_DETAILS.copy()
 
     return user_data
 
@@ -77,16 +95,18 @@ def delete_user(user_id: str):
 
 
 # 商品関連のルーター
-product_router = Router(prefix="/api/v1/products", tags=["products"])
+product_router = Router(prefix="/api/v1/products", tags=("products",))
 
 
 @product_router.get("/{category}")
 def get_products_by_category(category: str, limit: int = 10, offset: int = 0):
     """カテゴリ別商品取得"""
+    # 商品名の接頭辞はカテゴリで決まるため、ループの外で一度だけ整形する
+    name_prefix = f"{category.title()} Product"
     products = [
         {
             "id": f"prod-{category}-{i}",
-            "name": f"{category.title()} Product {i}",
+            "name": f"{name_prefix} {i}",
             "price": 100 + i * 10,
             "category": category,
         }
@@ -100,8 +120,19 @@ def get_products_by_category(category: str, limit: int = 10, offset: int = 0):
     }
 
 
+# デモ用の認証情報（モジュール読み込み時に一度だけ構築）
+_DEMO_USERS = MappingProxyType(
+    {
+        "admin": {
+            "password": b"password",
+            "profile": {"id": "admin-user", "username": "admin", "role": "administrator"},
+        },
+    }
+)
+
+
 # 認証関連のルーター
-auth_router = Router(prefix="/api/v1/auth", tags=["auth"])
+auth_router = Router(prefix="/api/v1/auth", tags=("auth",))
 
 
 @auth_router.post("/login")
@@ -109,33 +140,39 @@ def login(request):
     """ログイン"""
     credentials = request.json()
 
-    if credentials.get("username") == "admin" and credentials.get("password") == "password":
-
+    user = _DEMO_USERS.get(credentials.get("username", ""))
+    password = str(credentials.get("password", "")).encode()
+    # 定数時間比較でタイミング攻撃を防ぐ
+    if user and secrets.compare_digest(user["password"], password):
         return {
             "token": "dummy-jwt-token",
             "expires_in": 3600,
-            "user": {"id": "admin-user", "username": "admin", "role": "administrator"},
+            "user": user["profile"],
         }
     else:
         return Response({"error": "Invalid credentials"}, status_code=401)
 
 
 # 公開エンドポイント用のルーター
-public_router = Router(prefix="", tags=["public"])
+public_router = Router(prefix="", tags=("public",))
+
+# 固定レスポンスはインポート時に一度だけシリアライズしておく
+_HEALTH_BODY = JSONHandler.dumps({"status": "ok", "service": "lambapi"})
+_HELLO_MESSAGE = "Hello lambapi!!"
+_HELLO_BODY = JSONHandler.dumps({"message": _HELLO_MESSAGE})
 
 
 @public_router.get("/")
 def hello_world(request):
     """基本的な Hello World"""
-    msg = "Hello lambapi!!"
-    print(msg)
-    return {"message": msg}
+    print(_HELLO_MESSAGE)
+    return Response(_HELLO_BODY, pre_encoded=True)
 
 
 @public_router.get("/health")
 def health_check(request):
     """ヘルスチェック"""
-    return {"status": "ok", "service": "lambapi"}
+    return Response(_HEALTH_BODY, pre_encoded=True)
 
 
 @public_router.get("/error-test")
@@ -151,35 +188,28 @@ def error_test(request):
         return {"message": "No error"}
 
 
-def create_app(event, context):
-    """アプリケーション作成関数"""
-    app = API(event, context)
+# ルート・ミドルウェアはモジュール読み込み時（Lambda の init フェーズ）に一度だけ登録する
+app = API()
+
 
-    # CORS 設定のミドルウェア
-    def cors_middleware(request, response):
-        if isinstance(response, Response):
-            response.headers.update(
-                {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-                    "Access-Control-Allow-Headers": "Content-Type, Authorization",
-                }
-            )
-        return response
+# CORS 設定のミドルウェア
+def cors_middleware(request, response):
+    if isinstance(response, Response):
+        response.headers.update(_CORS_HEADERS)
+    return response
 
-    app.add_middleware(cors_middleware)
 
-    # ルーターを登録
-    app.add_router(public_router)
-    app.add_router(user_router)
-    app.add_router(product_router)
-    app.add_router(auth_router)
+app.add_middleware(cors_middleware)
 
-    return app
+# ルーターを登録
+app.add_router(public_router)
+app.add_router(user_router)
+app.add_router(product_router)
+app.add_router(auth_router)
 
 
 # Lambda 関数のエントリーポイント
-lambda_handler = create_lambda_handler(create_app)
+lambda_handler = create_lambda_handler(app)
 
 
 # ローカルテスト用コード
@@ -194,8 +224,8 @@ if __name__ == "__main__":
     }
 
     print("=== Test 1: Basic GET ===")
-    result1 = lambda_handler(test_event_1, None)
-    print(json.dumps(result1, indent=2, ensure_ascii=False))
+    result1 = app.dispatch(test_event_1)
+    print(JSONHandler.dumps(result1, indent=2))
 
     # テストケース 2: ルーター使用（ユーザー取得）
     test_event_2 = {
@@ -207,8 +237,8 @@ if __name__ == "__main__":
     }
 
     print("\n=== Test 2: GET User with Router ===")
-    result2 = lambda_handler(test_event_2, None)
-    print(json.dumps(result2, indent=2, ensure_ascii=False))
+    result2 = app.dispatch(test_event_2)
+    print(JSONHandler.dumps(result2, indent=2))
 
     # テストケース 3: POST（ユーザー作成）
     test_event_3 = {
@@ -216,12 +246,12 @@ if __name__ == "__main__":
         "path": "/users",
         "queryStringParameters": None,
         "headers": {"Content-Type": "application/json"},
-        "body": json.dumps({"name": "John Doe", "email": "john@example.com"}),
+        "body": JSONHandler.dumps({"name": "John Doe", "email": "john@example.com"}),
     }
 
     print("\n=== Test 3: POST User with Router ===")
-    result3 = lambda_handler(test_event_3, None)
-    print(json.dumps(result3, indent=2, ensure_ascii=False))
+    result3 = app.dispatch(test_event_3)
+    print(JSONHandler.dumps(result3, indent=2))
 
     # テストケース 4: 商品取得（ネストしたルート）
     test_event_4 = {
@@ -233,5 +263,5 @@ if __name__ == "__main__":
     }
 
     print("\n=== Test 4: GET Products with Router ===")
-    result4 = lambda_handler(test_event_4, None)
-    print(json.dumps(result4, indent=2, ensure_ascii=False))
+    result4 = app.dispatch(test_event_4)
+    print(JSONHandler.dumps(result4, indent=2))
@@ -5,41 +5,55 @@
 最小限の設定でモダンな API を作成します。
 """
 
-import json
-import sys
-import os
+from functools import lru_cache
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # ローカル実行時のみリポジトリ直下を import パスに追加（Lambda ではパッケージ直下に配置済み）
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from lambapi import API, Response, create_lambda_handler
+from lambapi.json_handler import JSONHandler
+
+
+# ルートはモジュール読み込み時に一度だけ登録する
+app = API()
+
+# 固定レスポンスはインポート時に一度だけシリアライズしておく
+_HELLO_BODY = JSONHandler.dumps({"message": "Hello, Lambda API!"})
+
+
+@app.get("/")
+def hello():
+    return Response(_HELLO_BODY, pre_encoded=True)
+
 
+@lru_cache(maxsize=1024)
+def _user_body(user_id: str) -> str:
+    """ユーザー ID だけで決まるレスポンスボディ（同じ ID の再リクエストではシリアライズしない）"""
+    return JSONHandler.dumps({"user_id": user_id, "name": f"User {user_id}"})
 
-def create_app(event, context):
-    """シンプルなアプリケーション作成"""
-    app = API(event, context)
 
-    @app.get("/")
-    def hello():
-        return {"message": "Hello, Lambda API!"}
+@app.get("/users/{user_id}")
+def get_user(user_id: str):
+    return Response(_user_body(user_id), pre_encoded=True)
 
-    @app.get("/users/{user_id}")
-    def get_user(user_id: str):
-        return {"user_id": user_id, "name": f"User {user_id}"}
 
-    @app.get("/search")
-    def search(q: str = "", limit: int = 10):
-        return {"query": q, "limit": limit, "results": []}
+@app.get("/search")
+def search(q: str = "", limit: int = 10):
+    return {"query": q, "limit": limit, "results": []}
 
-    @app.post("/users")
-    def create_user(request):
-        user_data = request.json()
-        return Response({"message": "User created", "user": user_data}, status_code=201)
 
-    return app
+@app.post("/users")
+def create_user(request):
+    user_data = request.json()
+    return Response({"message": "User created", "user": user_data}, status_code=201)
 
 
 # Lambda handler
-lambda_handler = create_lambda_handler(create_app)
+lambda_handler = create_lambda_handler(app)
 
 
 if __name__ == "__main__":
@@ -70,6 +84,6 @@ if __name__ == "__main__":
 
     for i, event in enumerate(test_events, 1):
         print(f"=== Test {i}: {event['httpMethod']} {event['path']} ===")
-        result = lambda_handler(event, None)
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        result = app.dispatch(event)
+        print(JSONHandler.dumps(result, indent=2))
         print()
@@ -4,60 +4,68 @@ lambapi の使用例
 pip install lambapi 後の基本的な使用方法を示すサンプル
 """
 
+from itertools import count, islice
+
 from lambapi import API, Response, create_lambda_handler, serve
 from lambapi.exceptions import ValidationError, NotFoundError
 
 
-def create_app(event, context):
-    app = API(event, context)
+# ルート・ミドルウェアはモジュール読み込み時（Lambda の init フェーズ）に一度だけ登録する
+app = API()
+
+# サンプルデータ
+users = {
+    "1": {"id": "1", "name": "Alice", "email": "alice@example.com"},
+    "2": {"id": "2", "name": "Bob", "email": "bob@example.com"},
+}
+
+# ユーザー ID 採番用カウンター（削除後も ID が重複しないよう単調増加させる）
+_user_id_gen = count(len(users) + 1)
 
-    # サンプルデータ
-    users = {
-        "1": {"id": "1", "name": "Alice", "email": "alice@example.com"},
-        "2": {"id": "2", "name": "Bob", "email": "bob@example.com"},
+
+@app.get("/")
+def root():
+    return {
+        "message": "Welcome to lambapi!",
+        "version": "1.0.0",
+        "usage": "Use lambapi serve usage_example to run locally",
     }
 
-    @app.get("/")
-    def root():
-        return {
-            "message": "Welcome to lambapi!",
-            "version": "1.0.0",
-            "usage": "Use lambapi serve usage_example to run locally",
-        }
 
-    @app.get("/users")
-    def get_users(limit: int = 10):
-        user_list = list(users.values())[:limit]
-        return {"users": user_list, "total": len(user_list)}
+@app.get("/users")
+def get_users(limit: int = 10):
+    # 辞書の values ビューから必要な件数だけ取り出し、全件のリスト化を避ける
+    user_list = list(islice(users.values(), max(limit, 0)))
+    return {"users": user_list, "total": len(user_list)}
+
 
-    @app.get("/users/{user_id}")
-    def get_user(user_id: str):
-        if user_id not in users:
-            raise NotFoundError("User", user_id)
-        return {"user": users[user_id]}
+@app.get("/users/{user_id}")
+def get_user(user_id: str):
+    if user_id not in users:
+        raise NotFoundError("User", user_id)
+    return {"user": users[user_id]}
 
-    @app.post("/users")
-    def create_user(request):
-        data = request.json()
 
-        if not data.get("name"):
-            raise ValidationError("Name is required", field="name")
+@app.post("/users")
+def create_user(request):
+    data = request.json()
 
-        user_id = str(len(users) + 1)
-        user = {
-            "id": user_id,
-            "name": data["name"],
-            "email": data.get("email", f"user{user_id}@example.com"),
-        }
-        users[user_id] = user
+    if not data.get("name"):
+        raise ValidationError("Name is required", field="name")
 
-        return Response({"message": "User created", "user": user}, status_code=201)
+    user_id = str(next(_user_id_gen))
+    user = {
+        "id": user_id,
+        "name": data["name"],
+        "email": data.get("email", f"user{user_id}@example.com"),
+    }
+    users[user_id] = user
 
-    return app
+    return Response({"message": "User created", "user": user}, status_code=201)
 
 
 # Lambda エントリーポイント
-lambda_handler = create_lambda_handler(create_app)
+lambda_handler = create_lambda_handler(app)
 
 
 if __name__ == "__main__":
@@ -3,19 +3,35 @@
 Query, Path, Body パラメータの依存性注入例
 """
 
-import json
-import sys
-import os
+import zlib
 from dataclasses import dataclass
 from typing import Optional
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__":
+    # ローカル実行時のみリポジトリ直下を import パスに追加（Lambda ではパッケージ直下に配置済み）
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from lambapi import API, Response, create_lambda_handler, Query, Path, Body
+from lambapi.json_handler import JSONHandler
+
+
+# CORS ヘッダー（モジュール読み込み時に一度だけ構築し、各レスポンスで共有する）
+_CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization",
+}
+
+
+# 固定レスポンスはインポート時に一度だけシリアライズしておく
+_HEALTH_BODY = JSONHandler.dumps({"status": "ok", "service": "lambapi"})
 
 
 # リクエスト用データクラス
-@dataclass
+@dataclass(slots=True)
 class CreateUserRequest:
     name: str
     email: str
@@ -23,7 +39,7 @@ class CreateUserRequest:
 
 
 # レスポンス用データクラス
-@dataclass
+@dataclass(slots=True)
 class UserResponse:
     id: str
     name: str
@@ -32,114 +48,108 @@ class UserResponse:
     created_at: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorResponse:
     error: str
     detail: str
 
 
-def create_app(event, context):
-    """アプリケーション作成関数"""
-    app = API(event, context)
-
-    # CORS 設定のミドルウェア
-    def cors_middleware(request, response):
-        if isinstance(response, Response):
-            response.headers.update(
-                {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-                    "Access-Control-Allow-Headers": "Content-Type, Authorization",
-                }
-            )
-        return response
-
-    app.add_middleware(cors_middleware)
-
-    # ===== 依存性注入を使ったルート定義 =====
-
-    @app.post("/users")
-    def create_user(user_data: CreateUserRequest = Body(...)):
-        """ユーザー作成（依存性注入付き）"""
-        # user_data は CreateUserRequest オブジェクトとして受け取れる
-        print(f"受信データ: name={user_data.name}, email={user_data.email}, age={user_data.age}")
-
-        # レスポンスデータを作成
-        response_data = {
-            "id": f"user_{hash(user_data.email) % 10000}",
-            "name": user_data.name,
-            "email": user_data.email,
-            "age": user_data.age,
-            "created_at": "2024-01-01T00:00:00Z",
-        }
+# ルート・ミドルウェアはモジュール読み込み時（Lambda の init フェーズ）に一度だけ登録する
+app = API()
 
-        return response_data
-
-    @app.get("/users/{user_id}")
-    def get_user(user_id: str = Path(...)):
-        """ユーザー取得（パスパラメータ依存性注入）"""
-        # サンプルユーザーデータ
-        user_data = {
-            "id": user_id,
-            "name": f"User {user_id}",
-            "email": f"user{user_id}@example.com",
-            "age": 25,
-            "created_at": "2024-01-01T00:00:00Z",
-        }
 
-        return user_data
+# CORS 設定のミドルウェア
+def cors_middleware(request, response):
+    if isinstance(response, Response):
+        response.headers.update(_CORS_HEADERS)
+    return response
 
-    # 従来の形式も併用可能
-    @app.get("/health")
-    def health_check(request):
-        """ヘルスチェック（従来形式）"""
-        return {"status": "ok", "service": "lambapi"}
 
-    @app.post("/users/legacy")
-    def create_user_legacy(request):
-        """ユーザー作成（従来形式）"""
-        try:
-            user_data = request.json()
+app.add_middleware(cors_middleware)
 
-            if not user_data.get("name"):
-                return Response({"error": "Name is required"}, status_code=400)
 
-            new_user = {
-                "id": "legacy-user-123",
-                "name": user_data["name"],
-                "email": user_data.get("email", ""),
-                "created_at": "2024-01-01T00:00:00Z",
-            }
+# ===== 依存性注入を使ったルート定義 =====
+@app.post("/users")
+def create_user(user_data: CreateUserRequest = Body(...)):
+    """ユーザー作成（依存性注入付き）"""
+    # user_data は CreateUserRequest オブジェクトとして受け取れる
+    print(f"受信データ: name={user_data.name}, email={user_data.email}, age={user_data.age}")
+
+    # レスポンスデータを作成
+    response_data = {
+        # hash() はプロセスごとにソルトされるため、プロセス間で安定する crc32 を使用
+        "id": f"user_{zlib.crc32(user_data.email.encode()) % 10000}",
+        "name": user_data.name,
+        "email": user_data.email,
+        "age": user_data.age,
+        "created_at": "2024-01-01T00:00:00Z",
+    }
 
-            return Response(
-                {"message": "User created successfully", "user": new_user}, status_code=201
-            )
+    return response_data
 
-        except Exception as e:
-            return Response({"error": "Invalid JSON data", "detail": str(e)}, status_code=400)
 
-    return app
+@app.get("/users/{user_id}")
+def get_user(user_id: str = Path(...)):
+    """ユーザー取得（パスパラメータ依存性注入）"""
+    # サンプルユーザーデータ
+    user_data = {
+        "id": user_id,
+        "name": f"User {user_id}",
+        "email": f"user{user_id}@example.com",
+        "age": 25,
+        "created_at": "2024-01-01T00:00:00Z",
+    }
+
+    return user_data
+
+
+# 従来の形式も併用可能
+@app.get("/health")
+def health_check(request):
+    """ヘルスチェック（従来形式）"""
+    return Response(_HEALTH_BODY, pre_encoded=True)
+
+
+@app.post("/users/legacy")
+def create_user_legacy(request):
+    """ユーザー作成（従来形式）"""
+    try:
+        user_data = request.json()
+
+        if not user_data.get("name"):
+            return Response({"error": "Name is required"}, status_code=400)
+
+        new_user = {
+            "id": "legacy-user-123",
+            "name": user_data["name"],
+            "email": user_data.get("email", ""),
+            "created_at": "2024-01-01T00:00:00Z",
+        }
+
+        return Response({"message": "User created successfully", "user": new_user}, status_code=201)
+
+    except Exception as e:
+        return Response({"error": "Invalid JSON data", "detail": str(e)}, status_code=400)
 
 
 # Lambda 関数のエントリーポイント
-lambda_handler = create_lambda_handler(create_app)
+lambda_handler = create_lambda_handler(app)
 
 
 # ローカルテスト用コード
 if __name__ == "__main__":
-
     # テストケース 1: バリデーション付きユーザー作成（正常）
     test_event_1 = {
         "httpMethod": "POST",
         "path": "/users",
         "queryStringParameters": None,
         "headers": {"Content-Type": "application/json"},
-        "body": json.dumps({"name": "John Doe", "email": "john@example.com", "age": 30}),
+        "body": JSONHandler.dumps({"name": "John Doe", "email": "john@example.com", "age": 30}),
     }
 
     print("=== Test 1: 依存性注入付きユーザー作成（正常） ===")
-    result1 = lambda_handler(test_event_1, None)
-    print(json.dumps(result1, indent=2, ensure_ascii=False))
+    result1 = app.dispatch(test_event_1)
+    print(JSONHandler.dumps(result1, indent=2))
 
     # テストケース 2: 依存性注入付きユーザー作成（バリデーションエラー）
     test_event_2 = {
@@ -147,7 +157,7 @@ if __name__ == "__main__":
         "path": "/users",
         "queryStringParameters": None,
         "headers": {"Content-Type": "application/json"},
-        "body": json.dumps(
+        "body": JSONHandler.dumps(
             {
                 "email": "john@example.com",
                 "age": 30,
@@ -157,8 +167,8 @@ if __name__ == "__main__":
     }
 
     print("\n=== Test 2: バリデーションエラー（name 不足） ===")
-    result2 = lambda_handler(test_event_2, None)
-    print(json.dumps(result2, indent=2, ensure_ascii=False))
+    result2 = app.dispatch(test_event_2)
+    print(JSONHandler.dumps(result2, indent=2))
 
     # テストケース 3: パスパラメータ依存性注入付きユーザー取得
     test_event_3 = {
@@ -170,8 +180,8 @@ if __name__ == "__main__":
     }
 
     print("\n=== Test 3: パスパラメータ依存性注入付きユーザー取得 ===")
-    result3 = lambda_handler(test_event_3, None)
-    print(json.dumps(result3, indent=2, ensure_ascii=False))
+    result3 = app.dispatch(test_event_3)
+    print(JSONHandler.dumps(result3, indent=2))
 
     # テストケース 4: 従来形式のヘルスチェック
     test_event_4 = {
@@ -183,8 +193,8 @@ if __name__ == "__main__":
     }
 
     print("\n=== Test 4: 従来形式のヘルスチェック ===")
-    result4 = lambda_handler(test_event_4, None)
-    print(json.dumps(result4, indent=2, ensure_ascii=False))
+    result4 = app.dispatch(test_event_4)
+    print(JSONHandler.dumps(result4, indent=2))
 
     # テストケース 5: 型変換テスト（age を文字列で送信）
     test_event_5 = {
@@ -192,11 +202,11 @@ if __name__ == "__main__":
         "path": "/users",
         "queryStringParameters": None,
         "headers": {"Content-Type": "application/json"},
-        "body": json.dumps(
+        "body": JSONHandler.dumps(
             {"name": "Jane Smith", "email": "jane@example.com", "age": "25"}  # 文字列として送信
         ),
     }
 
     print("\n=== Test 5: 型変換テスト（age 文字列→int） ===")
-    result5 = lambda_handler(test_event_5, None)
-    print(json.dumps(result5, indent=2, ensure_ascii=False))
+    result5 = app.dispatch(test_event_5)
+    print(JSONHandler.dumps(result5, indent=2))
@@ -18,6 +18,9 @@ lambapi
     lambda_handler = create_lambda_handler(create_app)
 """
 
+import importlib.util
+from typing import Any
+
 from .core import API, Route
 from .request import Request
 from .response import Response
@@ -43,13 +46,21 @@ from .error_handlers import error_handler, default_error_handler, ErrorHandler
 from .dev_tools import serve
 
 # 認証機能（オプション）
-try:
-    from .auth import DynamoDBAuth
+# pynamodb / PyJWT の読み込みはコールドスタートで重いため、実際に参照されるまで遅延する
+_AUTH_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ("pynamodb", "jwt"))
+
+
+def __getattr__(name: str) -> Any:
+    """DynamoDBAuth を初回アクセス時に読み込む（PEP 562）"""
+    if name == "DynamoDBAuth":
+        try:
+            from .auth import DynamoDBAuth
+        except ImportError:
+            DynamoDBAuth = None  # type: ignore
+        globals()["DynamoDBAuth"] = DynamoDBAuth
+        return DynamoDBAuth
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    _AUTH_AVAILABLE = True
-except ImportError:
-    _AUTH_AVAILABLE = False
-    DynamoDBAuth = None  # type: ignore
 
 __version__ = "0.2.17"
 __author__ = "Your Name"
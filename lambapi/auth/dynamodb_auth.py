@@ -612,14 +612,16 @@ class DynamoDBAuth:
 
     def _extract_token(self, request: Request) -> Optional[str]:
         """リクエストからトークンを抽出"""
-        auth_header = request.headers.get("Authorization") or request.headers.get("authorization")
+        auth_header = request.get_header("authorization")
         if not auth_header:
             return None
 
-        if not auth_header.startswith("Bearer "):
+        # "Bearer " を除去（接頭辞がなければ元の文字列がそのまま返る）
+        token = auth_header.removeprefix("Bearer ")
+        if token == auth_header:
             return None
 
-        return auth_header[7:]
+        return token
 
     def get_authenticated_user(self, request: Request):
         """認証済みユーザーを取得"""
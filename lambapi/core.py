@@ -4,12 +4,15 @@ API メインクラス
 モダンな Lambda 用 API フレームワークのコアクラスです。
 """
 
+import copy
 import re
 import inspect
-from typing import Dict, Any, Callable, Optional, List, Type, Union
+import weakref
+from typing import Dict, Any, Callable, Optional, List, Sequence, Tuple, Type, Union
 
 from .request import Request
 from .response import Response
+from .json_handler import JSONHandler
 from .cors import CORSConfig, create_cors_config
 from .error_handlers import get_global_registry
 from .base_router import BaseRouterMixin
@@ -18,9 +21,28 @@ from .dependencies import get_function_dependencies
 from .exceptions import ValidationError
 
 # パフォーマンス最適化用キャッシュ
-_SIGNATURE_CACHE: Dict[Callable, inspect.Signature] = {}
+# ファクトリ方式ではハンドラーが呼び出しごとに作り直されるため、弱参照で保持して溜め込まない
+_SIGNATURE_CACHE: "weakref.WeakKeyDictionary[Callable, inspect.Signature]" = (
+    weakref.WeakKeyDictionary()
+)
 _TYPE_CONVERTER_CACHE: Dict[Type, Callable[[str], Any]] = {}
 
+# ハンドラー呼び出し方式
+_CALL_REQUEST = "request"  # handler(request) の従来方式
+_CALL_DEPENDENCIES = "dependencies"  # 依存性注入方式
+_CALL_LEGACY = "legacy"  # パス・クエリパラメータの自動注入方式
+
+# 自動注入パラメータの取得元
+_PARAM_PATH = 0
+_PARAM_QUERY = 1
+_PARAM_REQUEST = 2
+
+# クエリパラメータが無い場合にデフォルト値も使わないことを示す番兵
+_NO_DEFAULT = object()
+
+# 固定レスポンスボディ（インポート時に一度だけシリアライズ）
+_NOT_FOUND_BODY = JSONHandler.dumps({"error": "Not Found"})
+
 
 def _get_type_converter(annotation: Type) -> Callable[[str], Any]:
     """型変換関数をキャッシュ付きで取得"""
@@ -62,6 +84,18 @@ def _get_type_converter(annotation: Type) -> Callable[[str], Any]:
     return converter
 
 
+def _get_signature(handler: Callable) -> inspect.Signature:
+    """ハンドラーのシグネチャをキャッシュから取得"""
+    try:
+        signature = _SIGNATURE_CACHE.get(handler)
+    except TypeError:
+        # 弱参照できない呼び出し可能オブジェクトはキャッシュしない
+        return inspect.signature(handler)
+    if signature is None:
+        signature = _SIGNATURE_CACHE[handler] = inspect.signature(handler)
+    return signature
+
+
 def _is_float(value: str) -> bool:
     """文字列が float に変換可能かチェック"""
     try:
@@ -71,6 +105,43 @@ def _is_float(value: str) -> bool:
         return False
 
 
+def _first_segment(path: str) -> Optional[str]:
+    """パスの先頭セグメントを取得（"/users/123" -> "users"）"""
+    if not path.startswith("/"):
+        return None
+    end = path.find("/", 1)
+    return path[1:end] if end != -1 else path[1:]
+
+
+# 複数ルートを 1 つの正規表現にまとめたマッチャー
+# (正規表現, {マーカーグループ名: (ルート, ((パラメータ名, グループ名), ...))})
+_RouteMatcher = Tuple["re.Pattern[str]", Dict[str, Tuple["Route", Tuple[Tuple[str, str], ...]]]]
+
+
+def _compile_route_matcher(routes: List["Route"]) -> _RouteMatcher:
+    """候補ルート群を登録順の選択肢として 1 つの正規表現に結合
+
+    正規表現の選択は左から順に試行されるため、ルートを 1 件ずつ照合する場合と
+    同じルートが選ばれる。グループ名の重複を避けるため、パラメータはルートごとに
+    別名のグループにし、マッチ後に元の名前へ戻す。
+    """
+    alternatives = []
+    markers: Dict[str, Tuple[Route, Tuple[Tuple[str, str], ...]]] = {}
+    for index, route in enumerate(routes):
+        marker = f"_r{index}"
+        params: List[Tuple[str, str]] = []
+
+        def _rename(match: "re.Match[str]") -> str:
+            group = f"{marker}_{len(params)}"
+            params.append((match.group(1), group))
+            return f"(?P<{group}>[^/]+)"
+
+        pattern = re.sub(r"\{(\w+)\}", _rename, route.path)
+        alternatives.append(f"(?P<{marker}>{pattern})")
+        markers[marker] = (route, tuple(params))
+    return re.compile(f"^(?:{'|'.join(alternatives)})$"), markers
+
+
 class Route:
     """ルート情報を保持するクラス"""
 
@@ -86,6 +157,8 @@ class Route:
         self.handler = handler
         self.cors_config = cors_config
         self.path_regex = self._compile_path_regex(path)
+        # ハンドラー呼び出し計画（初回ディスパッチ時に構築してキャッシュ）
+        self.call_plan: Optional[Tuple[str, List[Tuple[str, int, Any, Any]]]] = None
 
     def _compile_path_regex(self, path: str) -> re.Pattern:
         """パスパラメータを正規表現に変換"""
@@ -109,16 +182,29 @@ class Route:
 class API(BaseRouterMixin):
     """モダンな Lambda 用 API フレームワーク"""
 
-    def __init__(self, event: Dict[str, Any], context: Any, root_path: str = ""):
-        self.event = event
+    def __init__(
+        self,
+        event: Optional[Dict[str, Any]] = None,
+        context: Any = None,
+        root_path: str = "",
+        cors_config: Optional[CORSConfig] = None,
+    ):
+        # event / context はモジュールスコープでの構築時には未指定でよい（呼び出し時に束縛）
+        self.event: Dict[str, Any] = event if event is not None else {}
         self.context = context
         self.root_path = self._validate_root_path(root_path)
         self.routes: List[Route] = []
         # 高速ルート検索のための最適化構造
-        self._exact_routes: Dict[str, Dict[str, Route]] = {}  # method -> {path -> route}
+        # (method, path) -> route（完全一致ルートは 1 回の辞書参照で解決する）
+        self._exact_routes: Dict[Tuple[str, str], Route] = {}
         self._pattern_routes: Dict[str, List[Route]] = {}  # method -> [routes with params]
+        # method -> {先頭セグメント -> [候補ルート]}（None キーは先頭セグメントがパラメータのルート）
+        self._pattern_buckets: Dict[str, Dict[Optional[str], List[Route]]] = {}
+        # バケットごとに結合した正規表現（初回検索時に構築、ルート追加時に破棄）
+        self._bucket_matchers: Dict[Tuple[str, Optional[str]], _RouteMatcher] = {}
         self._middleware: List[Callable] = []
-        self._cors_config: Optional[CORSConfig] = None
+        # 構築済みの設定を渡すと、呼び出しごとに CORS 設定を組み立て直さずに済む
+        self._cors_config: Optional[CORSConfig] = cors_config
         self._error_registry = get_global_registry()
 
     def _validate_root_path(self, root_path: str) -> str:
@@ -159,23 +245,47 @@ class API(BaseRouterMixin):
         """ルートを高速検索用インデックスに追加"""
         method = route.method
 
-        # メソッド別辞書の初期化
-        if method not in self._exact_routes:
-            self._exact_routes[method] = {}
+        # メソッド別リストの初期化
         if method not in self._pattern_routes:
             self._pattern_routes[method] = []
 
         # パスパラメータがない場合は完全一致テーブルに追加
         if "{" not in route.path:
-            self._exact_routes[method][route.path] = route
+            self._exact_routes[(method, route.path)] = route
         else:
             # パスパラメータがある場合はパターンマッチング用リストに追加
             self._pattern_routes[method].append(route)
+            self._add_to_pattern_bucket(route)
+
+    def _add_to_pattern_bucket(self, route: Route) -> None:
+        """パラメータ付きルートを先頭セグメント別のバケットに追加
+
+        各バケットは登録順を保ったまま、先頭がパラメータのルートも含めて保持するため、
+        検索時は該当バケット 1 つを走査するだけで従来の線形探索と同じ結果になる。
+        """
+        self._bucket_matchers.clear()
+        buckets = self._pattern_buckets.setdefault(route.method, {})
+        wildcard = buckets.setdefault(None, [])
+        segment = _first_segment(route.path)
+
+        if segment is None or "{" in segment:
+            # 先頭がパラメータのルートはすべてのバケットに追加
+            wildcard.append(route)
+            for key, bucket in buckets.items():
+                if key is not None:
+                    bucket.append(route)
+        else:
+            if segment not in buckets:
+                # 新しいバケットは既存のワイルドカードルートを登録順で引き継ぐ
+                buckets[segment] = list(wildcard)
+            buckets[segment].append(route)
 
     def _rebuild_route_index(self) -> None:
         """ルートインデックスを再構築（add_router 時に使用）"""
         self._exact_routes.clear()
         self._pattern_routes.clear()
+        self._pattern_buckets.clear()
+        self._bucket_matchers.clear()
 
         for route in self.routes:
             self._update_route_index(route)
@@ -208,24 +318,20 @@ class API(BaseRouterMixin):
             expose_headers=expose_headers,
         )
 
-    def add_router(self, router: Any, prefix: str = "", tags: Optional[List[str]] = None) -> None:
+    def add_router(
+        self, router: Any, prefix: str = "", tags: Optional[Sequence[str]] = None
+    ) -> None:
         """ルーターを追加"""
         from .router import Router
 
         if isinstance(router, Router):
-            # プレフィックスやタグが指定されている場合は新しいルーターを作成
-            if prefix or tags:
-                new_router = Router(prefix=prefix, tags=tags or [])
-                for route in router.routes:
-                    # 既存のルートを新しいプレフィックス付きでコピー
-                    new_path = f"{prefix.rstrip('/')}{route.path}" if prefix else route.path
-                    new_route = Route(
-                        new_path,
-                        route.method,
-                        route.handler,
-                    )
-                    new_router.routes.append(new_route)
-                self.routes.extend(new_router.routes)
+            # タグはルーティングに影響しないため、プレフィックス指定時のみルートをコピーする
+            if prefix:
+                prefix = prefix.rstrip("/")
+                self.routes.extend(
+                    Route(f"{prefix}{route.path}", route.method, route.handler)
+                    for route in router.routes
+                )
             else:
                 self.routes.extend(router.routes)
 
@@ -273,16 +379,26 @@ class API(BaseRouterMixin):
         normalized_path = self._normalize_path(path)
 
         # 1. 完全一致検索（O(1)）
-        exact_routes = self._exact_routes.get(method, {})
-        if normalized_path in exact_routes:
-            return exact_routes[normalized_path], {}
-
-        # 2. パターンマッチング検索（パラメータ付きルート）
-        pattern_routes = self._pattern_routes.get(method, [])
-        for route in pattern_routes:
-            path_params = route.match(normalized_path, method)
-            if path_params is not None:
-                return route, path_params
+        route = self._exact_routes.get((method, normalized_path))
+        if route is not None:
+            return route, {}
+
+        # 2. パターンマッチング検索（先頭セグメントが一致するバケットを 1 回の正規表現で照合）
+        buckets = self._pattern_buckets.get(method)
+        if buckets:
+            segment = _first_segment(normalized_path)
+            if segment not in buckets:
+                segment = None
+            key = (method, segment)
+            matcher = self._bucket_matchers.get(key)
+            if matcher is None:
+                matcher = self._bucket_matchers[key] = _compile_route_matcher(buckets[segment])
+            regex, markers = matcher
+            match = regex.match(normalized_path)
+            if match:
+                # 外側のマーカーグループが最後に閉じるため lastgroup がマッチしたルートを示す
+                route, params = markers[match.lastgroup]  # type: ignore[index]
+                return route, {name: match.group(group) for name, group in params}
 
         return None, None
 
@@ -292,21 +408,16 @@ class API(BaseRouterMixin):
         """パスパラメータとクエリパラメータを自動注入してハンドラーを呼び出し"""
         handler = route.handler
 
-        # signature キャッシュを使用
-        if handler not in _SIGNATURE_CACHE:
-            _SIGNATURE_CACHE[handler] = inspect.signature(handler)
-        signature = _SIGNATURE_CACHE[handler]
-        handler_params = signature.parameters
+        # 呼び出し方式と引数の取得方法はルートごとに一度だけ決定する
+        if route.call_plan is None:
+            route.call_plan = self._build_call_plan(route)
+        call_mode, plan = route.call_plan
 
-        # 最初の引数が request かどうかをチェック（従来の方式）
-        param_names = list(handler_params.keys())
-        if param_names and param_names[0] in ["request", "req"]:
+        if call_mode == _CALL_REQUEST:
             # 従来の方式（request を第一引数に渡す）
             return handler(request)
 
-        # 新しい依存性注入システムを使用するかチェック
-        dependencies = get_function_dependencies(handler)
-        if dependencies:
+        if call_mode == _CALL_DEPENDENCIES:
             # 新しい依存性注入システムを使用
             # 認証が必要な場合は事前に認証処理を実行
             if getattr(handler, "_auth_required", False):
@@ -314,9 +425,57 @@ class API(BaseRouterMixin):
                 self._handle_authentication_for_dependency_injection(handler, request)
 
             return self._call_handler_with_dependencies(handler, request, path_params)
-        else:
-            # 従来のパラメータ注入システムを使用
-            return self._call_handler_legacy_params(handler, request, path_params, signature)
+
+        # 従来のパラメータ注入システムを使用（事前構築した計画に従って引数を組み立てる）
+        call_args: Dict[str, Any] = {}
+        query_params = request.query_params
+        for param_name, source, converter, default in plan:
+            if source == _PARAM_PATH:
+                if path_params and param_name in path_params:
+                    call_args[param_name] = path_params[param_name]
+                    continue
+            elif source == _PARAM_REQUEST:
+                call_args[param_name] = request
+                continue
+
+            if param_name in query_params:
+                call_args[param_name] = converter(query_params[param_name])
+            elif default is not _NO_DEFAULT:
+                call_args[param_name] = default
+
+        return handler(**call_args) if call_args else handler()
+
+    def _build_call_plan(self, route: Route) -> Tuple[str, List[Tuple[str, int, Any, Any]]]:
+        """ハンドラーのシグネチャから呼び出し方式と引数の取得計画を構築"""
+        handler = route.handler
+
+        handler_params = _get_signature(handler).parameters
+
+        # 最初の引数が request かどうかをチェック（従来の方式）
+        param_names = list(handler_params.keys())
+        if param_names and param_names[0] in ["request", "req"]:
+            return _CALL_REQUEST, []
+
+        # 新しい依存性注入システムを使用するかチェック
+        if get_function_dependencies(handler):
+            return _CALL_DEPENDENCIES, []
+
+        path_param_names = set(route.path_regex.groupindex)
+        plan: List[Tuple[str, int, Any, Any]] = []
+        for param_name, param_info in handler_params.items():
+            if param_name == "request":
+                plan.append((param_name, _PARAM_REQUEST, None, None))
+                continue
+
+            default = param_info.default
+            if default is inspect.Parameter.empty or hasattr(default, "source"):
+                # デフォルト値なし、または依存性注入用パラメータはクエリが無ければ渡さない
+                default = _NO_DEFAULT
+
+            source = _PARAM_PATH if param_name in path_param_names else _PARAM_QUERY
+            plan.append((param_name, source, _get_type_converter(param_info.annotation), default))
+
+        return _CALL_LEGACY, plan
 
     def _call_handler_with_dependencies(
         self, handler: Callable, request: Request, path_params: Optional[Dict[str, str]]
@@ -344,7 +503,7 @@ class API(BaseRouterMixin):
             raise
         except (AttributeError, TypeError, ImportError, KeyError):
             # 依存性注入固有のエラーのみ従来システムにフォールバック
-            signature = inspect.signature(handler)
+            signature = _get_signature(handler)
             return self._call_handler_legacy_params(handler, request, path_params, signature)
         except Exception:
             # 業務ロジックの例外は依存性注入が完了した後のエラーなのでそのまま再発生
@@ -397,8 +556,7 @@ class API(BaseRouterMixin):
         self, handler: Callable, request: Request, path_params: Optional[Dict[str, str]]
     ) -> Dict[str, Any]:
         """従来のパラメータ処理ロジックから基本パラメータを取得"""
-        signature = inspect.signature(handler)
-        handler_params = signature.parameters
+        handler_params = _get_signature(handler).parameters
         param_names = list(handler_params.keys())
         call_args: Dict[str, Any] = {}
 
@@ -427,7 +585,7 @@ class API(BaseRouterMixin):
     def _handle_cors_preflight(self, request: Request) -> Optional[Dict[str, Any]]:
         """CORS プリフライトリクエストを処理"""
         if request.method == "OPTIONS" and self._cors_config:
-            origin = request.headers.get("origin") or request.headers.get("Origin")
+            origin = request.get_header("origin")
             cors_headers = self._cors_config.get_cors_headers(origin)
             response = Response("", status_code=200, headers=cors_headers)
             return response.to_lambda_response()
@@ -435,7 +593,7 @@ class API(BaseRouterMixin):
 
     def _handle_route_not_found(self, request: Request) -> Dict[str, Any]:
         """ルートが見つからない場合の処理"""
-        response = Response({"error": "Not Found"}, status_code=404)
+        response = Response(_NOT_FOUND_BODY, status_code=404, pre_encoded=True)
         response = self._apply_cors_headers(request, response, None)
         return response.to_lambda_response()
 
@@ -444,10 +602,13 @@ class API(BaseRouterMixin):
     ) -> Request:
         """パスパラメータを処理"""
         if path_params:
-            if "pathParameters" not in self.event:
-                self.event["pathParameters"] = {}
-            self.event["pathParameters"].update(path_params)
-            request = Request(self.event)  # 更新された event で Request を再作成
+            # API Gateway は pathParameters を null で送ることがある
+            event_params = self.event.get("pathParameters")
+            if event_params is None:
+                event_params = self.event["pathParameters"] = {}
+            event_params.update(path_params)
+            # Request は作り直さず、デコード済みのクエリ・ヘッダーのキャッシュを引き継ぐ
+            request._path_params = None
         return request
 
     def _execute_handler(
@@ -594,7 +755,7 @@ class API(BaseRouterMixin):
                 cors_config = self._cors_config
 
             if cors_config:
-                origin = request.headers.get("origin") or request.headers.get("Origin")
+                origin = request.get_header("origin")
                 cors_headers = cors_config.get_cors_headers(origin)
                 response.headers.update(cors_headers)
         return response
@@ -635,3 +796,14 @@ class API(BaseRouterMixin):
 
         except Exception as e:
             return self._handle_global_error(e)
+
+    def dispatch(self, event: Dict[str, Any], context: Any = None) -> Dict[str, Any]:
+        """登録済みのルートを再利用して 1 件のイベントを処理
+
+        インスタンスを浅くコピーして event / context のみ差し替えるため、
+        ルート登録をやり直さずに複数のイベントを処理できる。
+        """
+        request_app = copy.copy(self)
+        request_app.event = event
+        request_app.context = context
+        return request_app.handle_request()
@@ -4,8 +4,8 @@ CORS (Cross-Origin Resource Sharing) 機能
 API Gateway + Lambda での CORS プリフライトリクエスト自動処理を提供します。
 """
 
-from typing import Dict, List, Optional, Union
-from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -18,6 +18,13 @@ class CORSConfig:
     allow_credentials: bool = False
     max_age: Optional[int] = None
     expose_headers: Optional[List[str]] = None
+    # Origin 以外の固定ヘッダーと、その構築に使った設定値のスナップショット
+    _static_headers: Optional[Dict[str, str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _static_key: Optional[Tuple[Any, ...]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self) -> None:
         """初期化後の処理"""
@@ -42,10 +49,9 @@ class CORSConfig:
         # デフォルトで最初のオリジンを返す
         return self.origins[0] if self.origins else "*"
 
-    def get_cors_headers(self, request_origin: Optional[str] = None) -> Dict[str, str]:
-        """CORS ヘッダーを生成"""
+    def _build_static_headers(self) -> Dict[str, str]:
+        """リクエストに依存しない CORS ヘッダーを構築"""
         headers = {
-            "Access-Control-Allow-Origin": self.get_origin_header(request_origin),
             "Access-Control-Allow-Methods": ", ".join(self.methods or []),
             "Access-Control-Allow-Headers": ", ".join(self.headers or []),
         }
@@ -61,6 +67,26 @@ class CORSConfig:
 
         return headers
 
+    def get_cors_headers(self, request_origin: Optional[str] = None) -> Dict[str, str]:
+        """CORS ヘッダーを生成"""
+        # リストのインプレース変更も検知できるよう、設定値のスナップショットと比較する
+        key = (
+            tuple(self.methods or ()),
+            tuple(self.headers or ()),
+            self.allow_credentials,
+            self.max_age,
+            tuple(self.expose_headers or ()),
+        )
+        static_headers = self._static_headers
+        if static_headers is None or key != self._static_key:
+            static_headers = self._static_headers = self._build_static_headers()
+            self._static_key = key
+
+        # 呼び出し側でレスポンスヘッダーとして変更されるため、毎回新しい辞書を返す
+        headers = {"Access-Control-Allow-Origin": self.get_origin_header(request_origin)}
+        headers.update(static_headers)
+        return headers
+
 
 def create_cors_config(
     origins: Union[str, List[str]] = "*",
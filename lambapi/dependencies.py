@@ -6,6 +6,13 @@ FastAPI 風の Query, Path, Body, Authenticated 依存性注入機能を提供
 
 from typing import Any, Optional, Dict, Callable
 import inspect
+import re
+import weakref
+
+# 関数ごとの依存性情報キャッシュ（関数が破棄されればエントリも消える）
+_DEPENDENCIES_CACHE: "weakref.WeakKeyDictionary[Callable, Dict[str, FieldInfo]]" = (
+    weakref.WeakKeyDictionary()
+)
 
 
 class FieldInfo:
@@ -34,6 +41,12 @@ class FieldInfo:
         self.min_length = min_length
         self.max_length = max_length
         self.regex = regex
+        # 正規表現は宣言時に一度だけコンパイルし、リクエストごとのキャッシュ参照を省く
+        self.regex_pattern = re.compile(regex) if regex is not None else None
+        # 制約が 1 つも無いパラメータはリクエストごとの制約チェックを省略する
+        self.has_constraints = any(
+            constraint is not None for constraint in (gt, ge, lt, le, min_length, max_length, regex)
+        )
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(default={self.default!r})"
@@ -240,6 +253,14 @@ def get_function_dependencies(func: Callable) -> Dict[str, FieldInfo]:
     Returns:
         パラメータ名をキーとした依存性情報の辞書
     """
+    try:
+        cached = _DEPENDENCIES_CACHE.get(func)
+    except TypeError:
+        # 弱参照できない呼び出し可能オブジェクトはキャッシュしない
+        cached = None
+    if cached is not None:
+        return cached
+
     sig = inspect.signature(func)
     dependencies = {}
 
@@ -248,6 +269,10 @@ def get_function_dependencies(func: Callable) -> Dict[str, FieldInfo]:
         if field_info is not None:
             dependencies[param_name] = field_info
 
+    try:
+        _DEPENDENCIES_CACHE[func] = dependencies
+    except TypeError:
+        pass
     return dependencies
 
 
@@ -4,9 +4,9 @@ Dependency Resolver モジュール
 依存性注入パラメータの解決・バリデーション処理を提供します。
 """
 
-import re
 import inspect
-from typing import Any, Dict, Optional, Type, Callable, get_type_hints
+import weakref
+from typing import Any, Dict, List, Optional, Tuple, Type, Callable, get_type_hints
 from dataclasses import is_dataclass
 
 from .dependencies import (
@@ -21,6 +21,63 @@ from .validation import validate_and_convert
 from .request import Request
 from .exceptions import ValidationError
 
+_SignatureInfo = Tuple[inspect.Signature, Dict[str, Any]]
+
+# 関数ごとのシグネチャ・型ヒントキャッシュ（関数が破棄されればエントリも消える）
+_SIGNATURE_CACHE: "weakref.WeakKeyDictionary[Callable, _SignatureInfo]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_signature_and_hints(func: Callable) -> _SignatureInfo:
+    """関数のシグネチャと型ヒントをキャッシュから取得"""
+    try:
+        cached = _SIGNATURE_CACHE.get(func)
+    except TypeError:
+        # 弱参照できない呼び出し可能オブジェクトはキャッシュしない
+        return inspect.signature(func), get_type_hints(func)
+    if cached is None:
+        cached = _SIGNATURE_CACHE[func] = (inspect.signature(func), get_type_hints(func))
+    return cached
+
+
+# (パラメータ名, Parameter, FieldInfo または None（request を渡す）, 型)
+_ResolutionPlan = Tuple[Tuple[str, inspect.Parameter, Optional[FieldInfo], Any], ...]
+
+# 関数ごとの解決計画キャッシュ
+_RESOLUTION_PLAN_CACHE: "weakref.WeakKeyDictionary[Callable, _ResolutionPlan]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _build_resolution_plan(func: Callable) -> _ResolutionPlan:
+    """シグネチャから解決が必要なパラメータだけを抜き出した計画を構築"""
+    sig, type_hints = _get_signature_and_hints(func)
+    dependencies = get_function_dependencies(func)
+    plan: List[Tuple[str, inspect.Parameter, Optional[FieldInfo], Any]] = []
+
+    for param_name, param in sig.parameters.items():
+        field_info = dependencies.get(param_name)
+        if field_info is not None:
+            plan.append((param_name, param, field_info, type_hints.get(param_name, str)))
+        elif param_name in ("request", "req"):
+            # 既存の request パラメータは従来通り処理（依存性注入が定義されていない場合のみ）
+            plan.append((param_name, param, None, None))
+
+    return tuple(plan)
+
+
+def _get_resolution_plan(func: Callable) -> _ResolutionPlan:
+    """関数の解決計画をキャッシュから取得"""
+    try:
+        plan = _RESOLUTION_PLAN_CACHE.get(func)
+    except TypeError:
+        # 弱参照できない呼び出し可能オブジェクトはキャッシュしない
+        return _build_resolution_plan(func)
+    if plan is None:
+        plan = _RESOLUTION_PLAN_CACHE[func] = _build_resolution_plan(func)
+    return plan
+
 
 class DependencyResolver:
     """依存性注入パラメータの解決とバリデーションを行うクラス"""
@@ -51,31 +108,25 @@ class DependencyResolver:
         Raises:
             ValidationError: バリデーションエラーが発生した場合
         """
-        sig = inspect.signature(func)
-        type_hints = get_type_hints(func)
-        dependencies = get_function_dependencies(func)
         resolved_params = {}
+        if path_params is None:
+            path_params = {}
 
-        # 各パラメータを処理
-        for param_name, param in sig.parameters.items():
-            # 既存の request パラメータは従来通り処理（依存性注入が定義されていない場合のみ）
-            if param_name in ["request", "req"] and dependencies.get(param_name) is None:
+        # シグネチャの解析は関数ごとに一度だけ行い、計画に沿って値を解決する
+        for param_name, param, field_info, param_type in _get_resolution_plan(func):
+            if field_info is None:
                 resolved_params[param_name] = request
                 continue
 
-            # 依存性注入パラメータの処理
-            field_info = dependencies.get(param_name)
-            if field_info is not None:
-                resolved_value = self._resolve_single_dependency(
-                    param_name=param_name,
-                    param=param,
-                    field_info=field_info,
-                    param_type=type_hints.get(param_name, str),
-                    request=request,
-                    path_params=path_params or {},
-                    authenticated_user=authenticated_user,
-                )
-                resolved_params[param_name] = resolved_value
+            resolved_params[param_name] = self._resolve_single_dependency(
+                param_name=param_name,
+                param=param,
+                field_info=field_info,
+                param_type=param_type,
+                request=request,
+                path_params=path_params,
+                authenticated_user=authenticated_user,
+            )
 
         return resolved_params
 
@@ -218,8 +269,11 @@ class DependencyResolver:
             # 基本的な型変換
             converted_value = self._convert_basic_type(raw_value, target_type)
 
-            # フィールド固有のバリデーション実行
-            self._validate_field_constraints(converted_value, field_info, param_name, param_source)
+            # フィールド固有のバリデーション実行（制約が宣言されている場合のみ）
+            if field_info.has_constraints:
+                self._validate_field_constraints(
+                    converted_value, field_info, param_name, param_source
+                )
 
             return converted_value
 
@@ -300,7 +354,8 @@ class DependencyResolver:
                 raise ValidationError(
                     f"{param_source} '{param_name}' は最大 {field_info.max_length} 文字までです"
                 )
-            if field_info.regex is not None and not re.match(field_info.regex, value):
+            pattern = field_info.regex_pattern
+            if pattern is not None and not pattern.match(value):
                 raise ValidationError(
                     f"{param_source} '{param_name}' は指定されたパターンにマッチしません"
                 )
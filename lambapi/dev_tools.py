@@ -3,8 +3,6 @@ lambapi 開発ツール
 pip install lambapi 後に使用可能な開発用ユーティリティ
 """
 
-from .uvicorn_server import serve_with_uvicorn
-
 
 def serve(app_path: str, host: str = "localhost", port: int = 8000) -> None:
     """
@@ -15,6 +13,9 @@ def serve(app_path: str, host: str = "localhost", port: int = 8000) -> None:
         host: バインドするホスト
         port: ポート番号
     """
+    # asyncio を含むサーバー実装は Lambda 実行時には不要なため、呼び出し時に読み込む
+    from .uvicorn_server import serve_with_uvicorn
+
     serve_with_uvicorn(app_path=app_path, host=host, port=port, reload=True)
 
 
@@ -4,6 +4,8 @@ Request クラス
 Lambda イベントからモダンな Request オブジェクトを提供します。
 """
 
+import base64
+import binascii
 from typing import Dict, Any, Optional
 from urllib.parse import unquote
 
@@ -17,6 +19,10 @@ class Request:
         self.event = event
         self._body: Optional[str] = None
         self._json: Optional[Dict[str, Any]] = None
+        self._query_params: Optional[Dict[str, str]] = None
+        self._headers: Optional[Dict[str, str]] = None
+        self._headers_lower: Optional[Dict[str, str]] = None
+        self._path_params: Optional[Dict[str, str]] = None
 
     @property
     def method(self) -> str:
@@ -30,31 +36,58 @@ class Request:
 
     @property
     def query_params(self) -> Dict[str, str]:
-        """クエリパラメータを取得"""
-        params = self.event.get("queryStringParameters") or {}
-        return {k: unquote(str(v)) for k, v in params.items()}
+        """クエリパラメータを取得（初回アクセス時に一度だけデコード）"""
+        if self._query_params is None:
+            params = self.event.get("queryStringParameters") or {}
+            self._query_params = {k: unquote(str(v)) for k, v in params.items()}
+        return self._query_params
 
     @property
     def headers(self) -> Dict[str, str]:
         """リクエストヘッダーを取得"""
-        headers = self.event.get("headers", {})
-        return {k: str(v) for k, v in headers.items()}
+        if self._headers is None:
+            headers = self.event.get("headers") or {}
+            self._headers = {k: str(v) for k, v in headers.items()}
+        return self._headers
+
+    def get_header(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """ヘッダーを大文字小文字を区別せずに取得"""
+        if self._headers_lower is None:
+            # 小文字化したキーの辞書を一度だけ構築し、以降は O(1) で参照する
+            self._headers_lower = {k.lower(): v for k, v in self.headers.items()}
+        return self._headers_lower.get(name.lower(), default)
 
     @property
     def body(self) -> str:
         """リクエストボディを取得"""
         if self._body is None:
-            self._body = str(self.event.get("body", ""))
+            raw_body = self.event.get("body", "")
+            # バイト列のボディ（ローカルサーバー等）は参照されたときにだけデコードする
+            if isinstance(raw_body, bytes):
+                self._body = raw_body.decode("utf-8")
+            else:
+                self._body = str(raw_body)
         return self._body
 
     def json(self) -> Dict[str, Any]:
         """JSON ボディをパース（最適化版）"""
         if self._json is None:
-            self._json = JSONHandler.loads(self.body)
+            raw_body = self.event.get("body")
+            if raw_body and self.event.get("isBase64Encoded"):
+                # デコード結果のバイト列をそのまま渡し、str への中間コピーを作らない
+                try:
+                    raw_body = base64.b64decode(raw_body)
+                except (binascii.Error, ValueError):
+                    raw_body = None
+            elif raw_body is not None and not isinstance(raw_body, (str, bytes)):
+                raw_body = str(raw_body)
+            self._json = JSONHandler.loads(raw_body)
         return self._json
 
     @property
     def path_params(self) -> Dict[str, str]:
         """パスパラメータを取得"""
-        params = self.event.get("pathParameters") or {}
-        return {k: str(v) for k, v in params.items()}
+        if self._path_params is None:
+            params = self.event.get("pathParameters") or {}
+            self._path_params = {k: str(v) for k, v in params.items()}
+        return self._path_params
@@ -13,16 +13,27 @@ class Response:
     """レスポンスオブジェクト"""
 
     def __init__(
-        self, content: Any = None, status_code: int = 200, headers: Optional[Dict[str, str]] = None
+        self,
+        content: Any = None,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        pre_encoded: bool = False,
     ):
         self.content = content
         self.status_code = status_code
         self.headers = headers or {}
+        # True の場合 content はシリアライズ済みの JSON（str / bytes）として扱う
+        self.pre_encoded = pre_encoded
 
     def to_lambda_response(self) -> Dict[str, Any]:
         """Lambda 用のレスポンス形式に変換"""
         body = self.content
-        if isinstance(body, (dict, list)):
+        if self.pre_encoded:
+            # 事前にエンコード済みのボディは再シリアライズしない
+            if isinstance(body, bytes):
+                body = body.decode("utf-8")
+            self.headers.setdefault("Content-Type", "application/json")
+        elif isinstance(body, (dict, list)):
             body = JSONHandler.dumps(body, ensure_ascii=False)
             self.headers.setdefault("Content-Type", "application/json")
         elif body is None:
@@ -5,7 +5,7 @@ Router クラス
 複数のルートをグループ化し、プレフィックスやタグを設定できます。
 """
 
-from typing import Callable, Optional, List, Any, Union
+from typing import Callable, Optional, List, Any, Sequence, Union
 
 from .core import Route
 from .base_router import BaseRouterMixin
@@ -15,13 +15,13 @@ from .cors import CORSConfig
 class Router(BaseRouterMixin):
     """ルータークラス"""
 
-    def __init__(self, prefix: str = "", tags: Optional[List[str]] = None):
+    def __init__(self, prefix: str = "", tags: Optional[Sequence[str]] = None):
         """
         ルーターを初期化
 
         Args:
             prefix: すべてのルートに適用されるパスプレフィックス
-            tags: ルートに適用されるタグのリスト
+            tags: ルートに適用されるタグ（リストまたはタプル）
         """
         self.prefix = prefix.rstrip("/")  # 末尾のスラッシュを削除
         self.tags = tags or []
@@ -41,7 +41,9 @@ class Router(BaseRouterMixin):
         self.routes.append(route)
         return handler
 
-    def add_router(self, router: Any, prefix: str = "", tags: Optional[List[str]] = None) -> None:
+    def add_router(
+        self, router: Any, prefix: str = "", tags: Optional[Sequence[str]] = None
+    ) -> None:
         """他のルーターを統合"""
         if isinstance(router, Router):
             # プレフィックスやタグが指定されている場合は調整
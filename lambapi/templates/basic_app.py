@@ -2,26 +2,27 @@
 基本的な lambapi アプリケーション
 """
 
+from types import SimpleNamespace
 from typing import Dict, Any
 from lambapi import API, create_lambda_handler
 
 
-def create_app(event: Dict[str, Any], context: Any) -> API:
-    app = API(event, context)
+# ルートはモジュール読み込み時に一度だけ登録し、ウォームスタートでは再利用する
+app = API()
 
-    @app.get("/")
-    def root() -> Dict[str, str]:
-        return {"message": "Hello, lambapi!", "version": "1.0.0"}
 
-    @app.get("/hello/{name}")
-    def hello(name: str) -> Dict[str, str]:
-        return {"message": f"Hello, {name}!"}
+@app.get("/")
+def root() -> Dict[str, str]:
+    return {"message": "Hello, lambapi!", "version": "1.0.0"}
 
-    return app
+
+@app.get("/hello/{name}")
+def hello(name: str) -> Dict[str, str]:
+    return {"message": f"Hello, {name}!"}
 
 
 # Lambda エントリーポイント
-lambda_handler = create_lambda_handler(create_app)
+lambda_handler = create_lambda_handler(app)
 
 
 if __name__ == "__main__":
@@ -34,6 +35,6 @@ if __name__ == "__main__":
         "body": None,
     }
 
-    context = type("Context", (), {"aws_request_id": "test-123"})()
+    context = SimpleNamespace(aws_request_id="test-123")
     result = lambda_handler(test_event, context)
     print(result)
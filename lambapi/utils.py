@@ -4,24 +4,32 @@
 Lambda API のヘルパー関数を提供します。
 """
 
-from typing import Dict, Any, Callable
+from typing import Dict, Any, Callable, Union
 from .core import API
 
 
 def create_lambda_handler(
-    app_factory: Callable[[Dict[str, Any], Any], API],
+    app_factory: Union[API, Callable[[Dict[str, Any], Any], API]],
 ) -> Callable[[Dict[str, Any], Any], Dict[str, Any]]:
     """Lambda 用のハンドラーを作成
 
     Args:
-        app_factory: API インスタンスを作成する関数
+        app_factory: API インスタンスを作成する関数、または構築済みの API インスタンス
 
     Returns:
         Lambda ハンドラー関数
     """
+    if isinstance(app_factory, API):
+        app = app_factory
 
-    def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-        app = app_factory(event, context)
-        return app.handle_request()
+        def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+            # ルート登録済みのインスタンスを再利用し、event / context のみ差し替える
+            return app.dispatch(event, context)
+
+    else:
+
+        def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+            app = app_factory(event, context)
+            return app.handle_request()
 
     return lambda_handler
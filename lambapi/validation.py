@@ -4,43 +4,58 @@
 リクエスト/レスポンスバリデーション機能を提供します。
 """
 
-from typing import Dict, Any, Type, Union, get_type_hints, get_origin, get_args, List
+from typing import Dict, Any, Type, Union, get_type_hints, get_origin, get_args, List, Tuple
 from dataclasses import fields, is_dataclass, MISSING
 
 # バリデーション最適化用キャッシュ
 _FIELD_INFO_CACHE: Dict[Type, Dict[str, Any]] = {}
 _TYPE_HINTS_CACHE: Dict[Type, Dict[str, Type]] = {}
+_MODEL_PLAN_CACHE: Dict[Type, Tuple[Tuple[str, Any, Any, Any], ...]] = {}
 
 
-def validate_and_convert(data: Dict[str, Any], model_class: Type) -> Any:
-    """辞書データを指定されたクラスに変換・バリデーション（最適化版）"""
-    if not is_dataclass(model_class):
-        raise ValueError(f"{model_class.__name__} はデータクラスである必要があります")
+def _get_field_info(model_class: Type) -> Dict[str, Any]:
+    """データクラスのフィールド情報をキャッシュから取得"""
+    field_info = _FIELD_INFO_CACHE.get(model_class)
+    if field_info is None:
+        field_info = _FIELD_INFO_CACHE[model_class] = {f.name: f for f in fields(model_class)}
+    return field_info
 
-    # キャッシュからフィールド情報を取得
-    if model_class not in _FIELD_INFO_CACHE:
-        _FIELD_INFO_CACHE[model_class] = {f.name: f for f in fields(model_class)}
-    field_info = _FIELD_INFO_CACHE[model_class]
 
-    # キャッシュから型ヒントを取得
-    if model_class not in _TYPE_HINTS_CACHE:
-        _TYPE_HINTS_CACHE[model_class] = get_type_hints(model_class)
-    type_hints = _TYPE_HINTS_CACHE[model_class]
+def _get_model_plan(model_class: Type) -> Tuple[Tuple[str, Any, Any, Any], ...]:
+    """データクラスの変換プランを取得（型の解析はクラスごとに一度だけ行う）
 
-    converted_data = {}
+    プランの各要素は (フィールド名, 型, デフォルト値, デフォルトファクトリ) のタプルです。
+    """
+    plan = _MODEL_PLAN_CACHE.get(model_class)
+    if plan is None:
+        if not is_dataclass(model_class):
+            raise ValueError(f"{model_class.__name__} はデータクラスである必要があります")
+
+        # キャッシュから型ヒントを取得
+        if model_class not in _TYPE_HINTS_CACHE:
+            _TYPE_HINTS_CACHE[model_class] = get_type_hints(model_class)
+        type_hints = _TYPE_HINTS_CACHE[model_class]
+
+        plan = _MODEL_PLAN_CACHE[model_class] = tuple(
+            (name, type_hints.get(name, str), f.default, f.default_factory)
+            for name, f in _get_field_info(model_class).items()
+        )
+    return plan
 
-    for field_name, field_obj in field_info.items():
-        field_type = type_hints.get(field_name, str)
 
+def validate_and_convert(data: Dict[str, Any], model_class: Type) -> Any:
+    """辞書データを指定されたクラスに変換・バリデーション（最適化版）"""
+    converted_data = {}
+
+    for field_name, field_type, default, default_factory in _get_model_plan(model_class):
         if field_name in data:
-            value = data[field_name]
-            converted_data[field_name] = _convert_value(value, field_type)
-        elif field_obj.default is not MISSING:
+            converted_data[field_name] = _convert_value(data[field_name], field_type)
+        elif default is not MISSING:
             # デフォルト値を使用
-            converted_data[field_name] = field_obj.default
-        elif field_obj.default_factory is not MISSING:
+            converted_data[field_name] = default
+        elif default_factory is not MISSING:
             # デフォルトファクトリを使用
-            converted_data[field_name] = field_obj.default_factory()
+            converted_data[field_name] = default_factory()
         else:
             # 必須フィールドが不足
             raise ValueError(f"必須フィールド '{field_name}' が不足しています")
@@ -135,29 +150,30 @@ def convert_to_dict(obj: Any) -> Any:
         return convert_to_dict(result_dict)
     elif is_dataclass(obj):
         result = {}
-        for field in fields(obj):
-            value = getattr(obj, field.name)
+        # fields() は呼び出しごとに __dataclass_fields__ を走査するためキャッシュを使用
+        for name in _get_field_info(type(obj)):
+            value = getattr(obj, name)
             if is_dataclass(value):
-                result[field.name] = convert_to_dict(value)
+                result[name] = convert_to_dict(value)
             elif isinstance(value, list):
                 converted_list: List[Any] = [
                     convert_to_dict(item) if is_dataclass(item) else item for item in value
                 ]
-                result[field.name] = converted_list
+                result[name] = converted_list
             elif isinstance(value, datetime.datetime):
-                result[field.name] = value.isoformat()
+                result[name] = value.isoformat()
             elif isinstance(value, datetime.date):
-                result[field.name] = value.isoformat()
+                result[name] = value.isoformat()
             elif isinstance(value, datetime.time):
-                result[field.name] = value.isoformat()
+                result[name] = value.isoformat()
             elif isinstance(value, uuid.UUID):
-                result[field.name] = str(value)
+                result[name] = str(value)
             elif isinstance(value, decimal.Decimal):
-                result[field.name] = str(value)
+                result[name] = str(value)
             elif isinstance(value, enum.Enum):
-                result[field.name] = value.value
+                result[name] = value.value
             else:
-                result[field.name] = value
+                result[name] = value
         return result
     elif isinstance(obj, dict):
         # 辞書の場合は各値を再帰的に変換
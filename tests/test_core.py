@@ -4,10 +4,11 @@ API コアクラスのテスト
 
 import sys
 import os
+import subprocess
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from lambapi import API, Response
+from lambapi import API, Request, Response
 
 
 class TestAPI:
@@ -326,6 +327,75 @@ class TestAPI:
         assert result["headers"]["X-Custom"] == "header-value"
         assert '"message":"Custom response"' in result["body"]
 
+    def test_pre_encoded_response(self):
+        """シリアライズ済みボディを持つ Response のテスト"""
+        event = self.create_test_event()
+        app = API(event, None)
+
+        @app.get("/")
+        def cached_response():
+            return Response(b'{"message":"cached"}', pre_encoded=True)
+
+        result = app.handle_request()
+
+        assert result["statusCode"] == 200
+        assert result["headers"]["Content-Type"] == "application/json"
+        assert result["body"] == '{"message":"cached"}'
+
+    def test_request_header_lookup_is_case_insensitive(self):
+        """ヘッダーの大文字小文字を区別しない取得のテスト"""
+        event = self.create_test_event(query_params={"q": "hello%20world"})
+        event["headers"] = {"Origin": "https://example.com", "x-api-key": "secret"}
+        request = Request(event)
+
+        assert request.get_header("origin") == "https://example.com"
+        assert request.get_header("X-API-Key") == "secret"
+        assert request.get_header("Authorization") is None
+        assert request.get_header("Authorization", "none") == "none"
+        # デコード済みのクエリパラメータは同じ辞書が再利用される
+        assert request.query_params["q"] == "hello world"
+        assert request.query_params is request.query_params
+
+    def test_request_json_base64_body(self):
+        """Base64 エンコードされたボディの JSON パーステスト"""
+        import base64
+
+        payload = '{"name": "テスト", "size": 3}'.encode("utf-8")
+        event = self.create_test_event(method="POST", body=base64.b64encode(payload).decode())
+        event["isBase64Encoded"] = True
+
+        assert Request(event).json() == {"name": "テスト", "size": 3}
+
+        event["body"] = "!!invalid-base64!!"
+        assert Request(event).json() == {}
+
+    def test_request_bytes_body(self):
+        """バイト列のボディが JSON パースとテキスト取得の両方で扱えることのテスト"""
+        payload = '{"name": "テスト"}'.encode("utf-8")
+        request = Request(self.create_test_event(method="POST", body=payload))
+
+        assert request.json() == {"name": "テスト"}
+        assert request.body == '{"name": "テスト"}'
+
+    def test_null_path_parameters_in_event(self):
+        """event の pathParameters が null の場合のパスパラメータ処理テスト"""
+        app = API()
+        seen = {}
+
+        @app.get("/users/{user_id}")
+        def get_user(request):
+            seen["path_params"] = request.path_params
+            return {"query": request.query_params.get("q")}
+
+        event = self.create_test_event(path="/users/7", query_params={"q": "x"})
+        event["pathParameters"] = None
+
+        result = app.dispatch(event)
+
+        assert result["statusCode"] == 200
+        assert result["body"] == '{"query":"x"}'
+        assert seen["path_params"] == {"user_id": "7"}
+
     def test_different_http_methods(self):
         """異なる HTTP メソッドのテスト"""
         methods_and_paths = [
@@ -494,6 +564,88 @@ class TestAPI:
         )
         assert "🚀" in result["body"] or "\\ud83d\\ude80" in result["body"]
 
+    def test_module_level_app_rebinding(self):
+        """モジュールスコープで構築した API に event を後から束縛するテスト"""
+        app = API()
+
+        @app.get("/users/{user_id}")
+        def get_user(user_id: str):
+            return {"user_id": user_id}
+
+        for user_id in ("1", "2"):
+            app.event = self.create_test_event(path=f"/users/{user_id}")
+            result = app.handle_request()
+            assert result["statusCode"] == 200
+            assert f'"user_id":"{user_id}"' in result["body"]
+
+    def test_dispatch_reuses_registered_routes(self):
+        """dispatch で構築済みのルートを再利用してイベントを処理するテスト"""
+        app = API()
+
+        @app.get("/users/{user_id}")
+        def get_user(user_id: str):
+            return {"user_id": user_id}
+
+        for user_id in ("1", "2"):
+            result = app.dispatch(self.create_test_event(path=f"/users/{user_id}"))
+            assert result["statusCode"] == 200
+            assert f'"user_id":"{user_id}"' in result["body"]
+
+        # 元のインスタンスの event / context は変更されない
+        assert app.event == {}
+        assert app.context is None
+
+    def test_call_plan_cached_per_route(self):
+        """ハンドラー呼び出し計画がルートごとにキャッシュされることのテスト"""
+        app = API()
+
+        @app.get("/items/{item_id}")
+        def get_item(item_id: str, limit: int = 5, request=None):
+            return {"item_id": item_id, "limit": limit, "has_request": request is not None}
+
+        app.event = self.create_test_event(path="/items/a", query_params={"limit": "7"})
+        result = app.handle_request()
+        assert '"item_id":"a"' in result["body"]
+        assert '"limit":7' in result["body"]
+        assert '"has_request":true' in result["body"]
+
+        route = app.routes[0]
+        plan = route.call_plan
+        assert plan is not None
+
+        app.event = self.create_test_event(path="/items/b")
+        result = app.handle_request()
+        assert '"item_id":"b"' in result["body"]
+        assert '"limit":5' in result["body"]
+        assert route.call_plan is plan
+
+
+class TestLazyImport:
+    """パッケージ読み込み時の遅延インポートのテスト"""
+
+    def test_auth_not_imported_on_package_import(self):
+        """import lambapi だけでは認証モジュールや開発サーバー（asyncio）を読み込まない"""
+        code = (
+            "import sys, lambapi; "
+            "assert 'lambapi.auth' not in sys.modules; "
+            "assert 'pynamodb' not in sys.modules; "
+            "assert 'boto3' not in sys.modules; "
+            "assert 'asyncio' not in sys.modules"
+        )
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, "-c", code], cwd=project_root)
+        assert result.returncode == 0
+
+    def test_dynamodb_auth_resolved_on_access(self):
+        """DynamoDBAuth は参照時に解決される"""
+        import lambapi
+
+        auth_class = lambapi.DynamoDBAuth
+        if lambapi._AUTH_AVAILABLE:
+            assert auth_class.__name__ == "DynamoDBAuth"
+        else:
+            assert auth_class is None
+
 
 if __name__ == "__main__":
     # pytest がない環境でも実行できるように直接テストを実行
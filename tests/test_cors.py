@@ -71,6 +71,29 @@ class TestCORS:
         headers = config.get_cors_headers("https://unauthorized.com")
         assert headers["Access-Control-Allow-Origin"] == "https://example.com"  # 最初のオリジン
 
+    def test_cors_static_headers_cached(self):
+        """Origin 以外の CORS ヘッダーがキャッシュされ、設定変更で再構築されることのテスト"""
+        config = create_cors_config(methods=["GET"])
+
+        first = config.get_cors_headers()
+        first["X-Extra"] = "mutated"
+        second = config.get_cors_headers()
+        # 返される辞書は毎回別物で、呼び出し側の変更はキャッシュに影響しない
+        assert "X-Extra" not in second
+        assert second["Access-Control-Allow-Methods"] == "GET"
+
+        config.methods = ["GET", "PUT"]
+        assert config.get_cors_headers()["Access-Control-Allow-Methods"] == "GET, PUT"
+
+    def test_cors_static_headers_follow_in_place_changes(self):
+        """リストのインプレース変更後もキャッシュが再構築されることのテスト"""
+        config = create_cors_config(methods=["GET"])
+
+        assert config.get_cors_headers()["Access-Control-Allow-Methods"] == "GET"
+
+        config.methods.append("POST")
+        assert config.get_cors_headers()["Access-Control-Allow-Methods"] == "GET, POST"
+
     def test_global_cors_enable(self):
         """グローバル CORS 有効化のテスト"""
         event = self.create_test_event(headers={"Origin": "https://example.com"})
@@ -90,6 +113,27 @@ class TestCORS:
         assert "Access-Control-Allow-Methods" in result["headers"]
         assert "Access-Control-Allow-Headers" in result["headers"]
 
+    def test_prebuilt_cors_config(self):
+        """構築済み CORS 設定をコンストラクタで共有するテスト"""
+        cors_config = create_cors_config(origins=["https://example.com"], methods=["GET"])
+
+        for _ in range(2):
+            event = self.create_test_event(headers={"Origin": "https://example.com"})
+            app = API(event, None, cors_config=cors_config)
+
+            @app.get("/")
+            def hello():
+                return {"message": "Hello"}
+
+            result = app.handle_request()
+
+            assert result["statusCode"] == 200
+            assert result["headers"]["Access-Control-Allow-Origin"] == "https://example.com"
+            assert result["headers"]["Access-Control-Allow-Methods"] == "GET"
+
+        # 固定ヘッダーのキャッシュはインスタンスをまたいで再利用される
+        assert cors_config._static_headers is not None
+
     def test_options_preflight_handling(self):
         """OPTIONS プリフライトリクエストの自動処理テスト"""
         event = self.create_test_event(
@@ -66,6 +66,9 @@ class TestDependencies:
         assert dependencies["age"].default == 25
         assert dependencies["age"].ge == 0
         assert dependencies["age"].le == 100
+        # 制約の有無は宣言時に判定される
+        assert dependencies["age"].has_constraints
+        assert not dependencies["email"].has_constraints
 
     def test_path_annotation(self):
         """Path アノテーション機能のテスト"""
@@ -111,6 +114,18 @@ class TestDependencies:
         assert len(dependencies) == 1
         assert isinstance(dependencies["user"], AuthenticatedInfo)
 
+    def test_function_dependencies_are_cached(self):
+        """依存性情報が関数ごとにキャッシュされることのテスト"""
+
+        def test_handler(q: str = Query("default")):
+            return {"q": q}
+
+        first = get_function_dependencies(test_handler)
+        assert get_function_dependencies(test_handler) is first
+
+        # 弱参照できない呼び出し可能オブジェクトも扱える
+        assert get_function_dependencies(len) == {}
+
 
 class TestDependencyResolver:
     """依存性リゾルバーのテスト"""
@@ -215,6 +230,21 @@ class TestDependencyResolver:
         with pytest.raises(ValidationError):
             self.resolver.resolve_dependencies(test_handler, request)
 
+    def test_regex_constraint(self):
+        """正規表現制約のテスト（パターンは宣言時にコンパイルされる）"""
+        category_query = Query("all", regex=r"^(electronics|books|all)$")
+        assert category_query.regex_pattern is not None
+
+        def test_handler(category: str = category_query):
+            pass
+
+        request = create_request(query_params={"category": "books"})
+        assert self.resolver.resolve_dependencies(test_handler, request)["category"] == "books"
+
+        request = create_request(query_params={"category": "toys"})
+        with pytest.raises(ValidationError, match="パターンにマッチしません"):
+            self.resolver.resolve_dependencies(test_handler, request)
+
     def test_missing_required_parameter(self):
         """必須パラメータが不足している場合のテスト"""
 
@@ -303,6 +333,18 @@ class TestDependencyResolver:
         # request パラメータには Request オブジェクト自体が渡される
         assert resolved["request"] is request
 
+    def test_resolution_plan_is_cached(self):
+        """解決計画が関数ごとに一度だけ構築されることのテスト"""
+        from lambapi.dependency_resolver import _get_resolution_plan
+
+        def test_handler(request, plain: str, name: str = Query("x")):
+            pass
+
+        plan = _get_resolution_plan(test_handler)
+        assert _get_resolution_plan(test_handler) is plan
+        # 依存性注入も request でもない引数は計画に含まれない
+        assert [entry[0] for entry in plan] == ["request", "name"]
+
     def test_request_parameter_with_body_annotation(self):
         """request パラメータに Body アノテーションがある場合のテスト"""
         from pynamodb.models import Model
@@ -255,6 +255,103 @@ class TestRouteSearchPerformance:
         # 再構築も高速であることを期待
         assert rebuild_time < 0.1  # 100ms 以内
 
+    def test_pattern_bucket_preserves_registration_order(self):
+        """先頭セグメント別バケットでも登録順の優先度が保たれることを確認"""
+        api = API(self.test_event, self.test_context)
+
+        @api.get("/{section}/items/{item_id}")
+        def section_item():
+            return {}
+
+        @api.get("/admin/items/{item_id}")
+        def admin_item():
+            return {}
+
+        @api.get("/users/{user_id}")
+        def get_user():
+            return {}
+
+        # 先に登録されたワイルドカードルートが優先される
+        route, params = api._find_route("/admin/items/1", "GET")
+        assert route.handler is section_item
+        assert params == {"section": "admin", "item_id": "1"}
+
+        route, params = api._find_route("/users/42", "GET")
+        assert route.handler is get_user
+        assert params == {"user_id": "42"}
+
+        # バケットが存在しない先頭セグメントはワイルドカードルートのみ走査
+        route, params = api._find_route("/shop/items/7", "GET")
+        assert route.handler is section_item
+
+        route, params = api._find_route("/unknown", "GET")
+        assert route is None and params is None
+
+    def test_bucket_matcher_maps_params_per_route(self):
+        """結合した正規表現でも各ルートのパラメータ名が正しく復元されることを確認"""
+        api = API(self.test_event, self.test_context)
+
+        @api.get("/users/{user_id}")
+        def get_user():
+            return {}
+
+        @api.get("/users/{user_id}/posts/{post_id}")
+        def get_post():
+            return {}
+
+        route, params = api._find_route("/users/1/posts/2", "GET")
+        assert route.handler is get_post
+        assert params == {"user_id": "1", "post_id": "2"}
+
+        # ルート追加後は結合済みの正規表現が再構築される
+        @api.get("/users/{user_id}/likes")
+        def get_likes():
+            return {}
+
+        route, params = api._find_route("/users/3/likes", "GET")
+        assert route.handler is get_likes
+        assert params == {"user_id": "3"}
+
+    def test_exact_routes_keyed_by_method_and_path(self):
+        """完全一致ルートが (method, path) の 1 回の辞書参照で解決されることを確認"""
+        api = API(self.test_event, self.test_context)
+
+        @api.get("/health")
+        def get_health():
+            return {}
+
+        @api.post("/health")
+        def post_health():
+            return {}
+
+        assert api._exact_routes[("GET", "/health")].handler is get_health
+        assert api._find_route("/health", "POST")[0].handler is post_health
+        assert api._find_route("/health", "DELETE") == (None, None)
+
+    def test_signature_cache_does_not_retain_handlers(self):
+        """ファクトリ方式で作り直されたハンドラーがシグネチャキャッシュに残らないことを確認"""
+        import gc
+
+        from lambapi.core import _SIGNATURE_CACHE
+
+        def create_app(event, context):
+            api = API(event, context)
+
+            @api.get("/items")
+            def get_items(limit: int = 10):
+                return {"limit": limit}
+
+            return api
+
+        event = {**self.test_event, "path": "/items", "queryStringParameters": {"limit": "5"}}
+        before = len(_SIGNATURE_CACHE)
+        for _ in range(3):
+            result = create_app(event, self.test_context).handle_request()
+            assert result["body"] == '{"limit":5}'
+        gc.collect()
+
+        assert len(_SIGNATURE_CACHE) <= before
+
 
 class TestLambdaColdStartSimulation:
     """Lambda コールドスタートシミュレーション"""
@@ -456,3 +456,22 @@ class TestRouter:
 
         # タグの統合は現在の実装では行われない
         # (将来の拡張で実装可能)
+
+    def test_api_add_router_with_tuple_tags(self):
+        """API へのタプル指定タグ付きルーター統合のテスト"""
+        from lambapi.core import API
+
+        router = Router(prefix="/items", tags=("items",))
+
+        @router.get("/{item_id}")
+        def get_item(item_id: str):
+            return {"item_id": item_id}
+
+        app = API()
+        app.add_router(router, prefix="/api/", tags=("api",))
+
+        assert router.tags == ("items",)
+        assert [route.path for route in app.routes] == ["/api/items/{item_id}"]
+        route, params = app._find_route("/api/items/1", "GET")
+        assert route.handler is get_item
+        assert params == {"item_id": "1"}
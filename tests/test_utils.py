@@ -195,6 +195,31 @@ class TestCreateLambdaHandler:
         assert result["statusCode"] == 200
         assert "message" in result["body"]
 
+    def test_lambda_handler_with_prebuilt_api(self):
+        """構築済み API インスタンスを渡した場合のテスト"""
+        app = API()
+
+        @app.get("/users/{user_id}")
+        def get_user(user_id: str):
+            return {"user_id": user_id}
+
+        handler = create_lambda_handler(app)
+
+        for user_id in ("1", "2"):
+            test_event = {
+                "httpMethod": "GET",
+                "path": f"/users/{user_id}",
+                "headers": {},
+                "queryStringParameters": None,
+                "body": None,
+            }
+            result = handler(test_event, Mock())
+            assert result["statusCode"] == 200
+            assert f'"user_id":"{user_id}"' in result["body"]
+
+        # 元のインスタンスの event は書き換えられない
+        assert app.event == {}
+
     def test_lambda_handler_callable_signature(self):
         """lambda_handler の呼び出しシグネチャテスト"""
         mock_api = Mock(spec=API)
@@ -7,7 +7,12 @@ lambapi.validation モジュールの各機能をテストします。
 import pytest
 from dataclasses import dataclass, field
 from typing import List, Optional, Any, Union
-from lambapi.validation import validate_and_convert, convert_to_dict, _convert_value
+from lambapi.validation import (
+    validate_and_convert,
+    convert_to_dict,
+    _convert_value,
+    _get_model_plan,
+)
 
 
 # テスト用データクラス定義
@@ -171,6 +176,12 @@ class TestValidateAndConvert:
         with pytest.raises(ValueError, match="NotADataclass はデータクラスである必要があります"):
             validate_and_convert({}, NotADataclass)
 
+    def test_model_plan_is_cached(self):
+        """変換プランがクラスごとに再利用されることのテスト"""
+        plan = _get_model_plan(SimpleUser)
+        assert _get_model_plan(SimpleUser) is plan
+        assert [entry[0] for entry in plan] == ["name", "age", "active"]
+
     def test_validation_error_in_constructor(self):
         """コンストラクタでのバリデーションエラーテスト"""
 
@@ -382,6 +393,19 @@ class TestConvertToDict:
         regular_list = [1, 2, 3]
         assert convert_to_dict(regular_list) == regular_list
 
+    def test_slotted_dataclass_roundtrip(self):
+        """slots=True のデータクラスの変換テスト"""
+
+        @dataclass(slots=True)
+        class SlottedUser:
+            name: str
+            age: int = 0
+
+        user = validate_and_convert({"name": "Slot", "age": "31"}, SlottedUser)
+        assert not hasattr(user, "__dict__")
+        assert user.age == 31
+        assert convert_to_dict(user) == {"name": "Slot", "age": 31}
+
     def test_datetime_serialization(self):
         """datetime オブジェクトのシリアライゼーションテスト"""
         import datetime
@@ -537,10 +561,11 @@ class TestCacheOptimization:
 
     def test_field_info_cache(self):
         """フィールド情報キャッシュのテスト"""
-        from lambapi.validation import _FIELD_INFO_CACHE
+        from lambapi.validation import _FIELD_INFO_CACHE, _MODEL_PLAN_CACHE
 
-        # キャッシュをクリア
+        # キャッシュをクリア（変換プランは _FIELD_INFO_CACHE から構築される）
         _FIELD_INFO_CACHE.clear()
+        _MODEL_PLAN_CACHE.clear()
 
         # 最初の呼び出し
         data1 = {"name": "Test1", "age": 25}
@@ -555,10 +580,11 @@ class TestCacheOptimization:
 
     def test_type_hints_cache(self):
         """型ヒントキャッシュのテスト"""
-        from lambapi.validation import _TYPE_HINTS_CACHE
+        from lambapi.validation import _TYPE_HINTS_CACHE, _MODEL_PLAN_CACHE
 
-        # キャッシュをクリア
+        # キャッシュをクリア（変換プランは _TYPE_HINTS_CACHE から構築される）
         _TYPE_HINTS_CACHE.clear()
+        _MODEL_PLAN_CACHE.clear()
 
         # 最初の呼び出し
         data1 = {"name": "Test1", "age": 25}